@@ -8,6 +8,9 @@ from pydantic import Field
 import httpx
 import os
 from app.agent.memory import get_memory
+from app.agent.scheduler import get_scheduler
+from app.config import LLM_API_URL, LLM_TIMEOUT
+from app.utils.tokens import estimate_tokens
 from app.agent.prompts import DEFAULT_AGENT_PREFIX, DEFAULT_AGENT_SUFFIX
 
 
@@ -15,6 +18,8 @@ class GitHubChatModel(BaseChatModel):
     temperature: float = Field(default=0.3)
     max_tokens: int = Field(default=256)
     github_token: str = Field(default=os.environ.get("GITHUB_API_TOKEN", None), exclude=True)
+    # Scheduler lane: "interactive" for agent steps, "batch" for bulk patch generation
+    priority: str = Field(default="interactive")
 
     def _convert_message(self, m):
         if isinstance(m, HumanMessage):
@@ -31,11 +36,16 @@ class GitHubChatModel(BaseChatModel):
             "temperature": kwargs.get("temperature", self.temperature),
             "max_tokens": kwargs.get("max_tokens", self.max_tokens),
         }
+        token = self.github_token or os.environ["GITHUB_API_TOKEN"]
         headers = {
-            "Authorization": f"Bearer {os.environ['GITHUB_API_TOKEN']}",
+            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        response = httpx.post("https://models.github.ai/inference/chat/completions", json=payload, headers=headers, timeout=30.0)
+        response = get_scheduler().submit(
+            lambda: httpx.post(LLM_API_URL, json=payload, headers=headers, timeout=LLM_TIMEOUT),
+            token=token,
+            priority=self.priority,
+        )
         response.raise_for_status()
         return response.json()["choices"][0]["message"]["content"]
 
@@ -43,19 +53,22 @@ class GitHubChatModel(BaseChatModel):
         content = self._call(messages, **kwargs)
         return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
 
+    def get_num_tokens(self, text: str) -> int:
+        return estimate_tokens(text)
+
     @property
     def _llm_type(self) -> str:
         return "github-chat-model"
 
 
-def get_agent(session_id: str, repo_path: str = None, github_token: str = None) -> BaseChatModel:
+def get_agent(session_id: str, repo_path=None, github_token: str = None) -> BaseChatModel:
     print("Get agent called with session_id:", session_id)
     llm = GitHubChatModel(github_token=github_token or os.environ.get("GITHUB_API_TOKEN", None))
     
     from app.agent.tools import get_tools
-    tools = get_tools(repo_path, github_token=github_token)
+    tools = get_tools(repo_path, github_token=github_token, session_id=session_id)
     
-    memory = get_memory(session_id)
+    memory = get_memory(session_id, llm=llm)
 
     agent = initialize_agent(
         tools=tools,
@@ -67,6 +80,7 @@ def get_agent(session_id: str, repo_path: str = None, github_token: str = None)
         agent_kwargs={
             "prefix": DEFAULT_AGENT_PREFIX,
             "suffix": DEFAULT_AGENT_SUFFIX,
+            "input_variables": ["input", "chat_history", "agent_scratchpad"],
         },
     )
     print("Agent initialized")
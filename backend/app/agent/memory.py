@@ -1,6 +1,175 @@
 # backend/app/agent/memory.py
 
-from langchain.memory import ConversationBufferMemory
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
 
-def get_memory(session_id: str):
-    return ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+from langchain.memory import ConversationSummaryBufferMemory
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from app.config import MEMORY_DB_PATH, MEMORY_MAX_TOKENS, MEMORY_TTL_SECONDS
+
+# How often (seconds) get_memory is allowed to sweep expired sessions
+EVICTION_INTERVAL = 300
+
+
+class SQLiteSessionStore:
+    """
+    Per-session message log plus running summary, kept in a local SQLite file
+    so sessions survive restarts and can be picked up by any worker on the node.
+    """
+
+    def __init__(self, path: str = MEMORY_DB_PATH):
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " session_id TEXT PRIMARY KEY, summary TEXT NOT NULL DEFAULT '', updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, body TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _touch(self, conn, session_id: str):
+        conn.execute(
+            "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?)"
+            " ON CONFLICT(session_id) DO UPDATE SET updated_at = excluded.updated_at",
+            (session_id, time.time()),
+        )
+
+    def load_messages(self, session_id: str) -> list[BaseMessage]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT body FROM messages WHERE session_id = ? ORDER BY id", (session_id,)
+            ).fetchall()
+        return messages_from_dict([json.loads(body) for (body,) in rows])
+
+    def append(self, session_id: str, message: BaseMessage):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO messages (session_id, body) VALUES (?, ?)",
+                (session_id, json.dumps(message_to_dict(message))),
+            )
+            self._touch(conn, session_id)
+
+    def drop_oldest(self, session_id: str, count: int):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM messages WHERE id IN ("
+                " SELECT id FROM messages WHERE session_id = ? ORDER BY id LIMIT ?)",
+                (session_id, count),
+            )
+
+    def get_summary(self, session_id: str) -> str:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT summary FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row[0] if row else ""
+
+    def set_summary(self, session_id: str, summary: str):
+        with closing(self._connect()) as conn, conn:
+            self._touch(conn, session_id)
+            conn.execute("UPDATE sessions SET summary = ? WHERE session_id = ?", (summary, session_id))
+
+    def clear(self, session_id: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict_expired(self, ttl: float = MEMORY_TTL_SECONDS) -> int:
+        """Deletes sessions idle for longer than `ttl` seconds. Returns how many were removed."""
+        cutoff = time.time() - ttl
+        with closing(self._connect()) as conn, conn:
+            expired = [sid for (sid,) in conn.execute("SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,))]
+            conn.executemany("DELETE FROM messages WHERE session_id = ?", [(sid,) for sid in expired])
+            conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        return len(expired)
+
+
+class SQLiteChatMessageHistory(BaseChatMessageHistory):
+    def __init__(self, session_id: str, store: SQLiteSessionStore):
+        self.session_id = session_id
+        self.store = store
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        return self.store.load_messages(self.session_id)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self.store.append(self.session_id, message)
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+
+
+class PersistentSummaryMemory(ConversationSummaryBufferMemory):
+    """
+    Keeps the most recent turns verbatim up to `max_token_limit` and folds
+    older turns into a running summary, both persisted per session.
+    """
+
+    session_id: str
+    store: SQLiteSessionStore
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def prune(self) -> None:
+        buffer = self.chat_memory.messages
+        sizes = [self.llm.get_num_tokens_from_messages([m]) for m in buffer]
+        total = sum(sizes)
+        if total <= self.max_token_limit:
+            return
+
+        pruned = 0
+        while pruned < len(buffer) and total > self.max_token_limit:
+            total -= sizes[pruned]
+            pruned += 1
+
+        self.moving_summary_buffer = self.predict_new_summary(buffer[:pruned], self.moving_summary_buffer)
+        self.store.set_summary(self.session_id, self.moving_summary_buffer)
+        self.store.drop_oldest(self.session_id, pruned)
+
+
+_store = None
+_store_lock = threading.Lock()
+_last_eviction = 0.0
+
+
+def get_store() -> SQLiteSessionStore:
+    global _store, _last_eviction
+    with _store_lock:
+        if _store is None:
+            _store = SQLiteSessionStore()
+        if time.time() - _last_eviction > EVICTION_INTERVAL:
+            _last_eviction = time.time()
+            evicted = _store.evict_expired()
+            if evicted:
+                print(f"Evicted {evicted} expired memory sessions")
+        return _store
+
+
+def get_memory(session_id: str, llm=None):
+    if llm is None:
+        from app.agent.core import GitHubChatModel
+        llm = GitHubChatModel()
+    store = get_store()
+    return PersistentSummaryMemory(
+        llm=llm,
+        session_id=session_id,
+        store=store,
+        chat_memory=SQLiteChatMessageHistory(session_id, store),
+        moving_summary_buffer=store.get_summary(session_id),
+        max_token_limit=MEMORY_MAX_TOKENS,
+        memory_key="chat_history",
+        input_key="input",
+        return_messages=False,
+    )
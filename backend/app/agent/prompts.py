@@ -19,8 +19,11 @@ DEFAULT_AGENT_SUFFIX = (
     "- get_diff: '<absolute_file_path>'\n"
     "- commit_changes: '<repo_path>\\n<commit_message>'\n"
     "- github_direct_update: '<owner>/<repo>\\n<file_path>\\n<new_content>\\n<commit_message>\\n[branch]'\n"
-    "- list_repo_files: '<ignored>'\n"
-    "- read_file_content: '<relative_or_absolute_path>'\n\n"
+    "- list_repo_files: 'glob=*.py contains=<text> under=<dir> offset=<n>' (all optional) or 'dirs [under=<dir>]'\n"
+    "- read_file_content: '<relative_or_absolute_path>' or '<path>:<start>-<end>' or '<path>::<SymbolName>'\n"
+    "- repo_structure: 'core [n]' or 'impact <path>' or 'deps <path>'\n"
+    "- hotspots: '[n]'\n\n"
+    "Conversation so far (older turns are summarized):\n{chat_history}\n\n"
     "Begin!\n\n"
     "Question: {input}\n"
     "Thought: {agent_scratchpad}"
@@ -0,0 +1,315 @@
+# backend/app/agent/scheduler.py
+
+import hashlib
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from app.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_PER_TOKEN_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_SECOND,
+    LLM_BURST,
+)
+
+# Lower value goes first. Interactive agent steps jump ahead of batch work
+# such as patch generation for /batch-review.
+PRIORITIES = {"interactive": 0, "batch": 10}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+BASE_DELAY = 0.5
+MAX_DELAY = 30.0
+
+
+class PrioritySemaphore:
+    """
+    Counting semaphore that hands free slots to the waiter with the lowest
+    (priority, arrival) ticket instead of whichever thread wakes up first.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def acquire(self, priority: int = 0):
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            while self._value <= 0 or self._waiters[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiters)
+            self._value -= 1
+            # the new head of the queue may be able to proceed too
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+
+class TokenBucket:
+    """
+    Request pacing. Each request takes one token; when the bucket runs dry,
+    callers queue by (priority, arrival) like PrioritySemaphore, so an
+    interactive request only waits for the next token, not behind every batch
+    request already waiting. The refill rate follows the rate-limit headers
+    returned by the API and halves on every 429. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate < 0 or capacity < 0:
+            raise ValueError(f"Token bucket rate and capacity must not be negative (got {rate}, {capacity})")
+        self.unlimited = rate == 0
+        self.max_rate = rate
+        self.min_rate = rate / 20
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = 0):
+        """Blocks until a token is available and this caller is first in line for it."""
+        if self.unlimited:
+            return
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            # a bucket smaller than one token still lets one request through per refill
+            need = min(1.0, self.capacity)
+            while True:
+                self._refill()
+                if self._waiters[0] == ticket and self._tokens >= need:
+                    break
+                # only the head can tell how long the refill takes; the rest wait to be notified
+                self._cond.wait((need - self._tokens) / self.rate if self._waiters[0] == ticket else None)
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._cond.notify_all()
+
+    @property
+    def depth(self) -> int:
+        return len(self._waiters)
+
+    def observe(self, remaining: int = None, reset_in: float = None):
+        if self.unlimited:
+            return
+        with self._cond:
+            self._refill()
+            if remaining is not None and reset_in:
+                self.rate = min(self.max_rate, max(self.min_rate, remaining / reset_in))
+                self._tokens = min(self._tokens, remaining)
+            else:
+                # additive increase back towards the configured rate
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+            # the head of the queue recomputes its wait at the new rate
+            self._cond.notify_all()
+
+    def penalize(self):
+        if self.unlimited:
+            return
+        with self._cond:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+            self._cond.notify_all()
+
+
+def _parse_duration(value: str):
+    """Parses '20', '1.5', '250ms', '1m30s' or an epoch timestamp into seconds from now."""
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+        return max(seconds - time.time(), 0.0) if seconds > 1e9 else seconds
+    except ValueError:
+        pass
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(n) * scale[unit] for n, unit in parts)
+
+
+def _rate_limit_headers(headers):
+    remaining = headers.get("x-ratelimit-remaining-requests") or headers.get("x-ratelimit-remaining")
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset")
+    try:
+        remaining = int(remaining) if remaining is not None else None
+    except ValueError:
+        remaining = None
+    return remaining, _parse_duration(reset)
+
+
+class LLMScheduler:
+    """
+    Sits between GitHubChatModel and the inference endpoint: bounds global and
+    per-token concurrency, paces requests, retries 429/5xx with jittered
+    exponential backoff and keeps queue/wait statistics.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        per_token_concurrency: int = LLM_PER_TOKEN_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        rate: float = LLM_REQUESTS_PER_SECOND,
+        burst: float = LLM_BURST,
+    ):
+        if rate < 0 or burst < 0:
+            raise ValueError(f"LLM_REQUESTS_PER_SECOND and LLM_BURST must not be negative (got {rate}, {burst})")
+        self.max_retries = max_retries
+        self._per_token_concurrency = per_token_concurrency
+        self._rate = rate
+        self._burst = burst
+        self._global = PrioritySemaphore(max_concurrency)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=1000)
+        self._stats = {
+            "requests": 0,
+            "attempts": 0,
+            "in_flight": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "transport_errors": 0,
+            "max_queue_depth": 0,
+            "by_priority": {name: 0 for name in PRIORITIES},
+        }
+
+    def _for_token(self, token: str):
+        key = hashlib.sha256((token or "").encode()).hexdigest()[:12]
+        with self._lock:
+            if key not in self._tokens:
+                self._tokens[key] = (
+                    PrioritySemaphore(self._per_token_concurrency),
+                    TokenBucket(self._rate, self._burst),
+                )
+            return self._tokens[key]
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            limits = list(self._tokens.values())
+        return self._global.depth + sum(slots.depth + bucket.depth for slots, bucket in limits)
+
+    def _record_wait(self, waited: float, priority: str, retry: bool):
+        with self._lock:
+            self._waits.append(waited)
+            self._stats["attempts"] += 1
+            self._stats["in_flight"] += 1
+            if not retry:
+                self._stats["requests"] += 1
+                self._stats["by_priority"][priority] = self._stats["by_priority"].get(priority, 0) + 1
+
+    def _bump(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def submit(self, send, token: str = None, priority: str = "interactive") -> httpx.Response:
+        """
+        Runs `send()` (which performs one HTTP request and returns an
+        httpx.Response) under the scheduler's limits, retrying when it makes
+        sense. Returns the last response; transport errors are re-raised once
+        retries are exhausted.
+        """
+        rank = PRIORITIES.get(priority, max(PRIORITIES.values()))
+        token_slots, bucket = self._for_token(token)
+        attempt = 0
+        while True:
+            queued_at = time.monotonic()
+            depth = self.queue_depth() + 1
+            with self._lock:
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+
+            # pace before taking a slot, so a request waiting for a token doesn't hold one
+            bucket.acquire(rank)
+            token_slots.acquire(rank)
+            self._global.acquire(rank)
+            self._record_wait(time.monotonic() - queued_at, priority, retry=attempt > 0)
+            response, error = None, None
+            try:
+                response = send()
+            except httpx.TransportError as e:
+                error = e
+                self._bump("transport_errors")
+            finally:
+                self._global.release()
+                token_slots.release()
+                self._bump("in_flight", -1)
+
+            retry_after = None
+            if response is not None:
+                bucket.observe(*_rate_limit_headers(response.headers))
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                if response.status_code == 429:
+                    self._bump("rate_limited")
+                    bucket.penalize()
+                else:
+                    self._bump("server_errors")
+                retry_after = _parse_duration(response.headers.get("retry-after"))
+
+            if attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+            if retry_after:
+                delay = max(delay, min(retry_after, MAX_DELAY))
+            attempt += 1
+            self._bump("retries")
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {**self._stats, "by_priority": dict(self._stats["by_priority"])}
+            rates = {key: round(bucket.rate, 3) for key, (_, bucket) in self._tokens.items()}
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4) if waits else 0.0
+
+        stats.update({
+            "queue_depth": self.queue_depth(),
+            "wait_p50": pct(0.50),
+            "wait_p95": pct(0.95),
+            "wait_max": round(waits[-1], 4) if waits else 0.0,
+            "request_rate": rates,
+        })
+        return stats
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
@@ -1,8 +1,9 @@
 # backend/app/agent/tools.py
 
-import tempfile
+import re
 from langchain.tools import tool
-from app.github.clone import clone_repo_from_url
+from concurrent.futures import Future
+from app.github.prefetch import open_snapshot
 from app.github import commit_push
 from pathlib import Path
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -11,7 +12,154 @@ from app.analysis.suggester import generate_patch
 from app.analysis.patcher import apply_patch_to_file, generate_diff
 from app.github.commit_push import commit_and_push
 from app.utils.text_cleaner import clean_truncate
+from app.utils.line_index import get_line_index
+from app.utils.tokens import estimate_tokens
+from app.github.tree_summary import summarize_tree, human_size
+from app.github.manifest import get_manifest
+from app.analysis.import_graph import get_import_graph
+from app.analysis.hotspots import churn_status, find_hotspots
 from app.github.commit_push import update_file
+from app.github.worktree import get_session_worktree
+
+# read_file_content limits: lines shown when no range is given, widest window allowed, output size
+READ_DEFAULT_LINES = 120
+READ_MAX_LINES = 400
+READ_MAX_CHARS = 4000
+
+# list_repo_files limits: entries per page by default, largest page allowed, output size
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+LIST_MAX_CHARS = 3000
+
+def parse_list_request(spec: str) -> dict:
+    """
+    Parses list_repo_files input such as "glob=*.py contains=auth offset=50" or
+    "dirs under=app depth=2". A bare word is a glob if it has wildcards,
+    otherwise a substring.
+    """
+    request = {"dirs": False, "refresh": False, "glob": None, "contains": None, "under": None,
+               "offset": 0, "limit": LIST_DEFAULT_LIMIT, "depth": 1}
+    for token in spec.strip().strip("'\"").split():
+        key, sep, value = token.partition("=")
+        if not sep:
+            if token in ("dirs", "refresh"):
+                request[token] = True
+            elif any(c in token for c in "*?["):
+                request["glob"] = token
+            else:
+                request["contains"] = token
+        elif key in ("offset", "limit", "depth", "cursor") and value.isdigit():
+            request["offset" if key == "cursor" else key] = int(value)
+        elif key in ("glob", "contains", "under"):
+            request[key] = value
+    request["limit"] = max(1, min(request["limit"], LIST_MAX_LIMIT))
+    request["depth"] = max(1, request["depth"])
+    return request
+
+def list_manifest_page(root: str, spec: str) -> str:
+    """Renders one bounded page of the repo's file manifest (or its directory rollup)."""
+    request = parse_list_request(spec)
+    manifest = get_manifest(root, refresh=request["refresh"])
+    matches = manifest.query(request["glob"], request["contains"], request["under"])
+    if request["dirs"]:
+        rows = [f"{d}/  ({count} files, {human_size(size)})" for d, count, size in manifest.rollup(matches, request["under"], request["depth"])]
+        noun = "directories"
+    else:
+        rows = [f"{path}  ({human_size(size)})" for path, size in matches]
+        noun = "files"
+
+    filters = " ".join(f"{key}={request[key]}" for key in ("glob", "contains", "under") if request[key])
+    if request["dirs"]:
+        filters = " ".join(filter(None, [filters, f"depth={request['depth']}"]))
+    start = min(request["offset"], len(rows))
+    page = []
+    size = 0
+    for row in rows[start:start + request["limit"]]:
+        size += len(row) + 1
+        if size > LIST_MAX_CHARS and page:
+            break
+        page.append(row)
+    end = start + len(page)
+
+    header = f"{len(rows)} {noun}" + (f" ({filters})" if filters else "")
+    if not rows:
+        return header + "."
+    if not page:
+        return f"{header}: no more entries past offset {request['offset']}."
+    lines = [f"{header}, showing {start + 1}-{end}:"] + page
+    if end < len(rows):
+        next_spec = " ".join(filter(None, ["dirs" if request["dirs"] else "", filters, f"offset={end}", f"limit={request['limit']}"]))
+        lines.append(f"... {len(rows) - end} more available. Next page: '{next_spec}'")
+    return "\n".join(lines)
+
+def parse_read_request(spec: str):
+    """
+    Splits "<path>", "<path>:<start>-<end>", "<path>:<line>" or "<path>::<symbol>"
+    into (path, start, end, symbol).
+    """
+    spec = spec.strip().strip("'\"")
+    if "::" in spec:
+        target, symbol = spec.rsplit("::", 1)
+        return target, None, None, symbol.strip()
+    match = re.match(r"^(.*):(\d+)(?:-(\d+))?$", spec)
+    if match:
+        target, start, end = match.groups()
+        return target, int(start), int(end or start), None
+    return spec, None, None, None
+
+def read_file_window(full_path: str, start: int = None, end: int = None, symbol: str = None, label: str = None) -> str:
+    """
+    Returns a numbered window of lines from a file, served from a cached
+    memory-mapped line index so deep windows of huge files stay cheap.
+    """
+    label = label or full_path
+    index = get_line_index(full_path)
+    if symbol:
+        span = index.find_symbol(symbol)
+        if span is None:
+            names = ", ".join(list(index.symbols())[:30])
+            return f"Symbol '{symbol}' not found in {label}. Known symbols: {names or 'none'}"
+        start, end = span
+    if start and end and end < start:
+        start, end = end, start
+    start = max(start or 1, 1)
+    end = end or start + READ_DEFAULT_LINES - 1
+    end = min(end, start + READ_MAX_LINES - 1)
+
+    text = index.read_lines(start, end)
+    lines = text.splitlines()
+    if not lines:
+        total = index.line_count()
+        if start > total:
+            return f"{label}: start {start} is past end of file ({total} lines)."
+    end = start + len(lines) - 1
+    body = []
+    size = 0
+    for number, line in enumerate(lines, start):
+        entry = f"{number:>6}| {line}"
+        size += len(entry) + 1
+        if size > READ_MAX_CHARS:
+            end = number - 1
+            body.append("... truncated, request a narrower line range to see more.")
+            break
+        body.append(entry)
+
+    total = index.total_if_known()
+    header = f"# {label} lines {start}-{end}" + (f" of {total}" if total is not None else "")
+    return header + "\n" + "\n".join(body)
+
+def central_modules_hint(repo_path: str, top: int = 8) -> str:
+    """Lists the most imported Python modules of a repo, for steering file selection."""
+    try:
+        graph = get_import_graph(repo_path)
+    except Exception as e:
+        print(f"Could not build import graph: {e}")
+        return ""
+    ranked = [(rel, score) for rel, score in graph.top_by_pagerank(top) if graph.imported_by[rel]]
+    if not ranked:
+        return ""
+    lines = [f"{rel} (imported by {len(graph.imported_by[rel])} files)" for rel, _ in ranked]
+    return "Most central Python modules (by import graph PageRank):\n" + "\n".join(lines)
 
 @tool
 def lint_file(path: str) -> str:
@@ -114,7 +262,6 @@ def load_and_analyze_repo(input: str) -> str:
     This tool will try to find useful files in the repo and summarize them.
     Input format: "<repo_url>\n<question>"
     """
-    import os
     print("Received input:", input)
 
     try:
@@ -132,12 +279,11 @@ def load_and_analyze_repo(input: str) -> str:
         print("Repo URL:", repo_url)
         print("Question:", question)
 
-        # Clone the repository
-        with tempfile.TemporaryDirectory() as tmpdir:
+        # Use the snapshot prefetched by /query-repo, or fetch it now
+        with open_snapshot(repo_url) as snapshot_path:
             from app.agent.core import GitHubChatModel
-            local_path = Path(tmpdir) / "repo"
-            print(f"Cloning repo from: {repo_url} to {local_path}")
-            clone_repo_from_url(repo_url, str(local_path))
+            local_path = Path(snapshot_path)
+            print(f"Using snapshot of {repo_url} at {local_path}")
 
             # Extended list of common files in diverse stacks
             files_to_check = [
@@ -203,23 +349,25 @@ Based on this, answer the following question in clear, natural English:
                 return clean_truncate(response)
 
             # Hail Mary Mode: No useful files found
-            file_tree = []
-            print("No useful files found. Walking through directory structure...")
-            for root, dirs, files in os.walk(local_path):
-                for name in files:
-                    rel_path = os.path.relpath(os.path.join(root, name), local_path)
-                    file_tree.append(rel_path)
-
-            if not file_tree:
+            print("No useful files found. Summarizing directory structure...")
+            tree_text = summarize_tree(str(local_path))
+
+            if not tree_text:
                 return "Cloned the repo, but it appears to be empty."
 
-            print(f"File tree found with {len(file_tree)} files.")
-            tree_text = "\n".join(file_tree)
+            central = central_modules_hint(str(local_path))
+            if central:
+                tree_text += "\n\n" + central
+            print(f"File tree summary is ~{estimate_tokens(tree_text)} tokens.")
             llm = GitHubChatModel()
             # Ask LLM which files to try opening
             print("Calling LLM to analyze file tree...")
             tool_response = llm._call([
-                SystemMessage(content="You are an expert developer. Given a file tree, identify the most useful files to read to understand this codebase."),
+                SystemMessage(content=(
+                    "You are an expert developer. Given a summarized file tree, identify the most useful files to read to understand this codebase. "
+                    "Directories are shown as '<dir>/  [<file count>, <size>; <extension counts>]' and only some are expanded; "
+                    "files are listed by their path relative to the repo root."
+                )),
                 HumanMessage(content=f"File tree:\n{tree_text}"),
                 HumanMessage(content="List up to 5 files you recommend reading to get an overview of this repo. Respond with only their relative paths, one per line.")
             ])
@@ -256,7 +404,11 @@ Based on this, answer the following question in clear, natural English:
         return f"Failed to analyze repo: {e}"
 
 
-def get_tools(repo_path=None, github_token=None):
+def get_tools(repo_path=None, github_token=None, session_id=None):
+    """
+    `repo_path` may be a directory or a Future resolving to one (a prefetch
+    still in flight); repo tools only wait on it when they're first used.
+    """
     print("get_tools called with repo_path:", repo_path)
     base_tools = [
         lint_file,
@@ -274,30 +426,135 @@ def get_tools(repo_path=None, github_token=None):
         print("No repo_path provided, returning base tools only.")
         return base_tools
 
-    from app.github.parser import walk_python_files
+    def base_path() -> str:
+        return repo_path.result() if isinstance(repo_path, Future) else repo_path
+
+    def worktree():
+        # the repo may be a snapshot shared with other sessions: work in a private copy-on-write overlay
+        return get_session_worktree(session_id, base_path())
+
+    def root() -> str:
+        return worktree().path if session_id else base_path()
+
+    if session_id:
+
+        @tool("apply_patch")
+        def session_apply_patch(input: str) -> str:
+            """
+            Given input as "<file_path>\n<patch_text>", applies patch to that file.
+            Use this when everything is sure the file exists and is correct.
+            """
+            try:
+                path, patch_text = input.strip().split("\n", 1)
+                return apply_patch_to_file(worktree().resolve(path), patch_text)
+            except Exception as e:
+                return f"Failed to apply patch: {e}"
+
+        @tool("get_diff")
+        def session_get_diff(path: str) -> str:
+            """
+            Show diff of the current file with its original version in the repo.
+            This will return the unified diff format.
+            """
+            try:
+                return worktree().diff(path.strip())
+            except Exception as e:
+                return f"Failed to diff file: {e}"
+
+        @tool("commit_changes")
+        def session_commit_changes(input: str) -> str:
+            """
+            Commit and push changes to the given GitHub repo.
+            Input format: "<repo_path>\n<commit_message>"
+            """
+            try:
+                path, commit_message = input.strip().split("\n", 1)
+                return commit_and_push(worktree().resolve(path), commit_message)
+            except Exception as e:
+                return f"Failed to parse input: {e}"
+
+        session_tools = {t.name: t for t in (session_apply_patch, session_get_diff, session_commit_changes)}
+        base_tools = [session_tools.get(t.name, t) for t in base_tools]
 
     @tool
     def list_repo_files(input: str) -> str:
         """
-        List all Python files in the current cloned repo. Input is ignored.
+        List files in the current cloned repo, one page at a time.
+        Input (all optional): "glob=<pattern>" (e.g. *.py or app/**/*.ts), "contains=<text>",
+        "under=<dir>", "offset=<n>", "limit=<n>". Start with "dirs" (optionally "depth=<n>")
+        to see file counts per directory instead of individual files.
         Use this when the file you are trying to access is not found.
         """
         print("Input to list_repo_files", input)
-        files = walk_python_files(repo_path)
-        return "\n".join(f["path"] for f in files if f.get("error") is None)
+        try:
+            return list_manifest_page(root(), input)
+        except Exception as e:
+            return f"Failed to list files: {e}"
 
     @tool
     def read_file_content(path: str) -> str:
         """
         Read contents of a file at the given path within the repo.
+        Accepts "<path>", "<path>:<start>-<end>" for a line window, or
+        "<path>::<SymbolName>" (e.g. "app/main.py::Server.run") for one function or class.
         Use this when you have confirmed the file exists.
         """
         try:
-            full_path = Path(path)
+            target, start, end, symbol = parse_read_request(path)
+            full_path = Path(target)
             if not full_path.is_absolute():
-                full_path = Path(repo_path) / path
-            return full_path.read_text(encoding="utf-8", errors="ignore")[:4000]  # limit to 4K
+                full_path = Path(root()) / target
+            return read_file_window(str(full_path), start, end, symbol, label=target)
         except Exception as e:
             return f"Error reading file: {e}"
-    print("Adding tools for repo path:", repo_path)  
-    return base_tools + [list_repo_files, read_file_content]
\ No newline at end of file
+    @tool
+    def repo_structure(input: str) -> str:
+        """
+        Answer structural questions using the repo's Python import graph.
+        Input: "core [n]" for the n most central modules, "impact <path>" for every
+        file affected by changing <path>, or "deps <path>" for what <path> depends on.
+        """
+        try:
+            command, _, arg = input.strip().partition(" ")
+            graph = get_import_graph(root())
+            if command == "core":
+                top = int(arg) if arg.strip().isdigit() else 10
+                ranked = graph.top_by_pagerank(top)
+                return "\n".join(f"{rel} (imported by {len(graph.imported_by[rel])}, rank {score:.4f})" for rel, score in ranked)
+            if command in ("impact", "deps"):
+                rel = graph.normalize(arg.strip())
+                if rel is None:
+                    return f"{arg.strip()} is not a Python file in this repo."
+                related = graph.dependents(rel, transitive=True) if command == "impact" else graph.dependencies(rel, transitive=True)
+                return "\n".join(related) or "None."
+            return "Unknown command. Use 'core [n]', 'impact <path>' or 'deps <path>'."
+        except Exception as e:
+            return f"Failed to inspect repo structure: {e}"
+
+    @tool
+    def hotspots(input: str) -> str:
+        """
+        List the riskiest functions in the repo: high complexity and deep nesting
+        in files that change often. Input: "[n]" for the top n (default 10).
+        Review and patch these first.
+        """
+        try:
+            top = int(input.strip()) if input.strip().isdigit() else 10
+            ranked = find_hotspots(root(), top=top)
+            lines = [
+                f"{h['file']}:{h['line']}-{h['end_line']} {h['name']} "
+                f"(complexity {h['complexity']}, nesting {h['nesting']}, {h['size']} lines, {h['commits']} commits, score {h['score']})"
+                for h in ranked
+            ]
+            if not lines:
+                return "No functions found."
+            status = churn_status(root())
+            if status != "available":
+                history = "no git history" if status == "unavailable" else "only a shallow git history"
+                lines.insert(0, f"Note: this snapshot has {history}, so functions are ranked by complexity alone.")
+            return "\n".join(lines)
+        except Exception as e:
+            return f"Failed to rank hotspots: {e}"
+
+    print("Adding tools for repo path:", repo_path)
+    return base_tools + [list_repo_files, read_file_content, repo_structure, hotspots]
\ No newline at end of file
@@ -0,0 +1,198 @@
+# backend/app/analysis/batch.py
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from app.analysis.hotspots import churn_status, find_hotspots, in_spans
+from app.analysis.linter import run_pylint
+from app.analysis.suggester import parse_pylint_output, generate_patch, generate_hunk_patch
+from app.config import BATCH_CLONE_CONCURRENCY, BATCH_LINT_CONCURRENCY, BATCH_LLM_CONCURRENCY
+from app.github.clone import clone_repo_from_url
+from app.github.parser import walk_python_files
+from app.github.workspace import get_workspace_manager
+
+# A recipe describes what to do with each repo:
+#   lint        - run pylint over every Python file
+#   types       - only keep issues of these categories (e.g. ["Error", "Warning"])
+#   max_issues  - cap on issues reported per repo
+#   patches     - number of files per repo to send to the LLM for a suggested patch
+#   hotspots    - if set, patch the issues inside the N riskiest functions
+#                 (complexity x churn) instead of whole files, riskiest first
+DEFAULT_RECIPE = {
+    "lint": True,
+    "types": None,
+    "max_issues": 200,
+    "patches": 0,
+    "hotspots": 0,
+}
+
+TYPE_PRIORITY = {"Error": 0, "Warning": 1, "Refactor": 2, "Convention": 3, "Info": 4}
+
+
+def make_limits(network: int = None, cpu: int = None, llm: int = None) -> dict:
+    """Creates the per-stage semaphores. Must be called inside the running event loop."""
+    return {
+        "network": asyncio.Semaphore(network or BATCH_CLONE_CONCURRENCY),
+        "cpu": asyncio.Semaphore(cpu or BATCH_LINT_CONCURRENCY),
+        "llm": asyncio.Semaphore(llm or BATCH_LLM_CONCURRENCY),
+    }
+
+
+async def _lint_file(path: str, limits: dict) -> list:
+    async with limits["cpu"]:
+        lint = await asyncio.to_thread(run_pylint, path)
+    return parse_pylint_output(lint["output"])
+
+
+async def review_repo(repo_url: str, recipe: dict, limits: dict) -> dict:
+    """
+    Runs one repo through the clone -> lint -> suggest stages. Each stage holds
+    a slot of its own semaphore only while it works, so one repo can be linting
+    while the next is still cloning and another is waiting on the LLM.
+    """
+    started = time.monotonic()
+    result = {"repo_url": repo_url, "status": "ok"}
+    stage = "clone"
+    workspace = None
+    try:
+        async with limits["network"]:
+            # lease only once a clone slot is free, so queued repos don't hold quota
+            workspace = await asyncio.to_thread(get_workspace_manager().acquire, "batch")
+            local_path = await asyncio.to_thread(clone_repo_from_url, repo_url, workspace)
+
+        if not recipe.get("lint"):
+            return result
+
+        stage = "lint"
+        async with limits["cpu"]:
+            files = await asyncio.to_thread(walk_python_files, local_path)
+        paths = [f["path"] for f in files if f.get("error") is None]
+        per_file = await asyncio.gather(*(_lint_file(p, limits) for p in paths))
+
+        issues = [issue for parsed in per_file for issue in parsed]
+        if recipe.get("types"):
+            issues = [i for i in issues if i["type"] in recipe["types"]]
+        for issue in issues:
+            issue["file"] = os.path.relpath(issue["file"], local_path)
+        issues.sort(key=lambda i: TYPE_PRIORITY.get(i["type"], len(TYPE_PRIORITY)))
+
+        result["files_linted"] = len(paths)
+        result["total"] = len(issues)
+        result["issues"] = issues[: recipe.get("max_issues") or len(issues)]
+
+        if recipe.get("patches") and recipe.get("hotspots"):
+            stage = "suggest"
+            async with limits["cpu"]:
+                hotspots = await asyncio.to_thread(find_hotspots, local_path, recipe["hotspots"])
+            result["hotspots"] = hotspots
+            result["churn"] = await asyncio.to_thread(churn_status, local_path)
+            result["patches"] = await _suggest_hotspot_patches(local_path, issues, hotspots, recipe["patches"], limits)
+        elif recipe.get("patches"):
+            stage = "suggest"
+            result["patches"] = await _suggest_patches(local_path, issues, recipe["patches"], limits)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{stage}: {e}"
+    finally:
+        if workspace is not None:
+            # rmtree of a whole checkout: keep it off the event loop
+            await asyncio.to_thread(workspace.release)
+        result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
+
+
+async def _suggest_patches(local_path: str, issues: list, limit: int, limits: dict) -> list:
+    by_file = {}
+    for issue in issues:
+        by_file.setdefault(issue["file"], []).append(issue)
+
+    async def suggest(rel_path, file_issues):
+        description = "\n".join(f"Line {i['line']}: {i['message']} ({i['code']})" for i in file_issues)
+        async with limits["llm"]:
+            patch = await asyncio.to_thread(generate_patch, str(Path(local_path) / rel_path), description, "batch")
+        return {"file": rel_path, "patch": patch}
+
+    # issues are already sorted by severity, so the first files seen are the worst
+    selected = list(by_file.items())[:limit]
+    return await asyncio.gather(*(suggest(rel_path, file_issues) for rel_path, file_issues in selected))
+
+
+async def _suggest_hotspot_patches(local_path: str, issues: list, hotspots: list, limit: int, limits: dict) -> list:
+    async def suggest(hotspot, fn_issues):
+        description = "\n".join(f"Line {i['line']}: {i['message']} ({i['code']})" for i in fn_issues)
+        async with limits["llm"]:
+            patch = await asyncio.to_thread(
+                generate_hunk_patch, str(Path(local_path) / hotspot["file"]), hotspot["line"], hotspot["end_line"],
+                description, hotspot["file"], 3, "batch",
+            )
+        return {"file": hotspot["file"], "function": hotspot["name"], "score": hotspot["score"], "patch": patch}
+
+    # hotspots come riskiest first; functions without lint issues don't spend LLM budget
+    selected = []
+    for hotspot in hotspots:
+        fn_issues = [
+            i for i in issues
+            if i["file"] == hotspot["file"] and in_spans(i["line"], [(hotspot["line"], hotspot["end_line"])])
+        ]
+        if fn_issues:
+            selected.append((hotspot, fn_issues))
+        if len(selected) >= limit:
+            break
+    return await asyncio.gather(*(suggest(hotspot, fn_issues) for hotspot, fn_issues in selected))
+
+
+async def run_batch(repo_urls: list, recipe: dict = None, limits: dict = None):
+    """
+    Reviews every repo concurrently and yields each result as soon as that repo
+    finishes, so one slow repo doesn't hold back the rest of the report.
+    """
+    recipe = {**DEFAULT_RECIPE, **(recipe or {})}
+    limits = limits or make_limits()
+    tasks = [asyncio.create_task(review_repo(url, recipe, limits)) for url in repo_urls]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_cli(repo_urls: list, recipe: dict, limits: dict):
+    async for result in run_batch(repo_urls, recipe, make_limits(**limits)):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Review many GitHub repos and stream NDJSON results.")
+    parser.add_argument("repos", nargs="*", help="Repo URLs. Use '-' to read them from stdin, one per line.")
+    parser.add_argument("--repos-file", help="File with one repo URL per line.")
+    parser.add_argument("--recipe", help="Path to a JSON recipe, or an inline JSON object.")
+    parser.add_argument("--network", type=int, help="Max concurrent clones.")
+    parser.add_argument("--cpu", type=int, help="Max concurrent lint processes.")
+    parser.add_argument("--llm", type=int, help="Max concurrent LLM calls.")
+    args = parser.parse_args(argv)
+
+    repo_urls = [r for r in args.repos if r != "-"]
+    if "-" in args.repos:
+        repo_urls += [line.strip() for line in sys.stdin if line.strip()]
+    if args.repos_file:
+        repo_urls += [line.strip() for line in Path(args.repos_file).read_text().splitlines() if line.strip()]
+    if not repo_urls:
+        parser.error("No repositories given.")
+
+    recipe = {}
+    if args.recipe:
+        recipe_path = Path(args.recipe)
+        recipe = json.loads(recipe_path.read_text() if recipe_path.exists() else args.recipe)
+
+    asyncio.run(_run_cli(repo_urls, recipe, {"network": args.network, "cpu": args.cpu, "llm": args.llm}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# backend/app/analysis/diff_review.py
+
+import re
+from bisect import bisect_right
+from pathlib import Path
+
+from app.analysis.linter import run_pylint
+from app.analysis.suggester import parse_pylint_output, generate_hunk_patch
+from app.github.client import (
+    parse_github_url,
+    compare_refs,
+    resolve_ref,
+    get_pull_request,
+    get_pull_request_files,
+    get_file_at_ref,
+)
+from app.github.workspace import get_workspace_manager
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+
+def changed_line_ranges(patch_text: str) -> list[tuple[int, int]]:
+    """
+    Returns the (start, end) line ranges that were added or modified on the
+    new side of a unified diff. Pure deletions don't produce a range.
+    """
+    ranges = []
+    new_line = None
+    for line in patch_text.splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            new_line = int(header.group(1))
+            continue
+        if new_line is None:
+            # file headers ("--- a/...", "+++ b/...") before the first hunk
+            continue
+        if line.startswith("+"):
+            if ranges and ranges[-1][1] == new_line - 1:
+                ranges[-1] = (ranges[-1][0], new_line)
+            else:
+                ranges.append((new_line, new_line))
+            new_line += 1
+        elif line.startswith("-") or line.startswith("\\"):
+            continue
+        else:
+            new_line += 1
+    return ranges
+
+
+def find_range(line: int, ranges: list[tuple[int, int]]):
+    """Returns the range containing `line`, or None. `ranges` must be sorted."""
+    idx = bisect_right(ranges, (line, float("inf"))) - 1
+    if idx >= 0 and ranges[idx][0] <= line <= ranges[idx][1]:
+        return ranges[idx]
+    return None
+
+
+def collect_changed_files(owner: str, repo: str, base: str = None, head: str = None, pr_number: int = None, token: str = None):
+    """
+    Returns (head_sha, {filename: [(start, end), ...]}) for the Python files
+    touched by a PR or a base...head comparison.
+    """
+    if pr_number is not None:
+        head_sha = get_pull_request(owner, repo, pr_number, token)["head"]["sha"]
+        files = get_pull_request_files(owner, repo, pr_number, token)
+    elif base and head:
+        # the comparison lists at most 250 commits, so its last one isn't necessarily head
+        head_sha = resolve_ref(owner, repo, head, token)
+        files = compare_refs(owner, repo, base, head_sha, token).get("files", [])
+    else:
+        raise ValueError("Provide either a PR number or both base and head refs.")
+
+    changed = {}
+    for f in files:
+        filename = f["filename"]
+        if f.get("status") == "removed" or not filename.endswith(".py"):
+            continue
+        if "patch" in f:
+            ranges = changed_line_ranges(f["patch"])
+        else:
+            # GitHub omits the patch for very large diffs; treat the whole file as changed
+            ranges = [(1, float("inf"))]
+        if ranges:
+            changed[filename] = ranges
+    return head_sha, changed
+
+
+def review_diff(
+    repo_url: str,
+    base: str = None,
+    head: str = None,
+    pr_number: int = None,
+    token: str = None,
+    suggest: bool = False,
+    max_patches: int = 5,
+) -> dict:
+    """
+    Lints only the files changed between base and head (or in a PR), keeps the
+    issues that land on changed lines and optionally asks the LLM for a patch
+    per affected hunk. Only changed files are downloaded, so the cost scales
+    with the diff rather than the repo.
+    """
+    owner, repo = parse_github_url(repo_url)
+    head_sha, changed = collect_changed_files(owner, repo, base, head, pr_number, token)
+    print(f"Reviewing {len(changed)} changed Python files at {head_sha}")
+
+    issues = []
+    patches = []
+    with get_workspace_manager().lease("review") as workspace:
+        for filename, ranges in changed.items():
+            local_path = Path(workspace.path) / filename
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                content = get_file_at_ref(owner, repo, filename, head_sha, token)
+                workspace.check_quota(len(content))
+                local_path.write_bytes(content)
+            except Exception as e:
+                print(f"Error fetching {filename}: {e}")
+                continue
+
+            lint = run_pylint(str(local_path))
+            issues_by_hunk = {}
+            for issue in parse_pylint_output(lint["output"]):
+                hunk = find_range(issue["line"], ranges)
+                if hunk is None:
+                    continue
+                issue["file"] = filename
+                issues.append(issue)
+                issues_by_hunk.setdefault(hunk, []).append(issue)
+
+            if not suggest:
+                continue
+            for (start, end), hunk_issues in issues_by_hunk.items():
+                if len(patches) >= max_patches:
+                    break
+                if end == float("inf"):
+                    end = max(i["line"] for i in hunk_issues)
+                description = "\n".join(f"Line {i['line']}: {i['message']} ({i['code']})" for i in hunk_issues)
+                patches.append({
+                    "file": filename,
+                    "start": start,
+                    "end": end,
+                    "patch": generate_hunk_patch(str(local_path), start, end, description, display_path=filename, priority="batch"),
+                })
+
+    return {
+        "head": head_sha,
+        "files_reviewed": len(changed),
+        "total": len(issues),
+        "issues": issues,
+        "patches": patches,
+    }
@@ -0,0 +1,177 @@
+# backend/app/analysis/duplicates.py
+
+import hashlib
+import io
+import keyword
+import os
+import tokenize
+from collections import defaultdict
+
+from app.analysis.suggester import categorize_lint
+
+# k: tokens per fingerprinted k-gram; WINDOW: winnowing window. Any shared run
+# of at least K + WINDOW - 1 normalized tokens is guaranteed to be detected.
+K = 25
+WINDOW = 8
+# Fingerprints shared by more files than this are boilerplate, not clones
+MAX_POSTINGS = 20
+# Shared fingerprints needed before a region of two files is reported as a clone
+MIN_SHARED = 3
+# Lines allowed between shared fingerprints of one cloned region
+MAX_RUN_GAP = 5
+
+DUPLICATE_MSG_ID = "R0801"
+DUPLICATE_CODE = "duplicate-code"
+
+SKIP_TOKENS = {
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT,
+    tokenize.ENCODING, tokenize.ENDMARKER,
+}
+
+
+def normalized_tokens(code: str) -> list:
+    """
+    Tokenizes Python source with identifiers and literals collapsed, so renamed
+    copies still match. Returns [(token, line)].
+    """
+    tokens = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type in SKIP_TOKENS:
+                continue
+            if tok.type == tokenize.NAME and not keyword.iskeyword(tok.string):
+                text = "N"
+            elif tok.type in (tokenize.STRING, tokenize.NUMBER):
+                text = "L"
+            else:
+                text = tok.string
+            tokens.append((text, tok.start[0]))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        pass
+    return tokens
+
+
+def _hash(gram) -> int:
+    return int.from_bytes(hashlib.blake2b("\x00".join(gram).encode(), digest_size=8).digest(), "big")
+
+
+def winnow(tokens: list, k: int = K, window: int = WINDOW) -> list:
+    """
+    Selects fingerprints from the k-gram hashes: the minimum of every window
+    (rightmost on ties), each kept once. Returns [(hash, start_line, end_line)].
+    """
+    if len(tokens) < k:
+        return []
+    texts = [t for t, _ in tokens]
+    hashes = [_hash(texts[i:i + k]) for i in range(len(tokens) - k + 1)]
+    fingerprints = []
+    last = -1
+    for start in range(max(len(hashes) - window + 1, 1)):
+        chunk = hashes[start:start + window]
+        pos = start + min(range(len(chunk)), key=lambda i: (chunk[i], -i))
+        if pos != last:
+            fingerprints.append((hashes[pos], tokens[pos][1], tokens[pos + k - 1][1]))
+            last = pos
+    return fingerprints
+
+
+def clone_runs(spans: list, gap: int = MAX_RUN_GAP) -> list:
+    """
+    Splits the shared fingerprints of a file pair, [(a_start, a_end, b_start,
+    b_end)], into runs that are contiguous on both sides, so two separate
+    clones in the same pair of files are reported separately instead of as
+    one range covering the unrelated code between them.
+    """
+    runs = []
+    for span in sorted(spans):
+        a_start, a_end, b_start, b_end = span
+        for run in reversed(runs):
+            run_a_end = max(s[1] for s in run)
+            run_b_start = min(s[2] for s in run)
+            run_b_end = max(s[3] for s in run)
+            if a_start <= run_a_end + gap and run_b_start - gap <= b_start <= run_b_end + gap:
+                run.append(span)
+                break
+        else:
+            runs.append([span])
+    return runs
+
+
+def find_duplicates(files: list, root: str = None) -> list:
+    """
+    Finds near-duplicate regions across parsed files (the output of
+    walk_python_files) through an inverted fingerprint index, so the work is
+    linear in the amount of code rather than in the number of file pairs.
+    Returns one suggestion dict per duplicated region, in the same format as
+    parse_pylint_output.
+    """
+    index = defaultdict(list)
+    for f in files:
+        if f.get("error") is not None:
+            continue
+        for fp, start, end in winnow(normalized_tokens(f["code"])):
+            index[fp].append((f["path"], start, end))
+
+    # (file_a, file_b) -> list of (a_start, a_end, b_start, b_end)
+    shared = defaultdict(list)
+    for postings in index.values():
+        if len(postings) < 2 or len(postings) > MAX_POSTINGS:
+            continue
+        for i, (path_a, start_a, end_a) in enumerate(postings):
+            for path_b, start_b, end_b in postings[i + 1:]:
+                if path_a == path_b and start_a <= end_b and start_b <= end_a:
+                    # overlapping windows of the same region, not a copy
+                    continue
+                key, span = ((path_a, path_b), (start_a, end_a, start_b, end_b))
+                if path_b < path_a:
+                    key, span = ((path_b, path_a), (start_b, end_b, start_a, end_a))
+                shared[key].append(span)
+
+    pairs = {}
+    for key, spans in shared.items():
+        runs = [run for run in clone_runs(spans) if len(run) >= MIN_SHARED]
+        if runs:
+            pairs[key] = runs
+
+    # group files that share clones into clusters (union-find)
+    parent = {}
+
+    def find(path):
+        parent.setdefault(path, path)
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for path_a, path_b in pairs:
+        parent[find(path_a)] = find(path_b)
+    cluster_size = defaultdict(int)
+    for path in list(parent):
+        cluster_size[find(path)] += 1
+
+    suggestions = []
+    for (path_a, path_b), runs in pairs.items():
+        size = cluster_size[find(path_a)]
+        cluster = f"; clone cluster of {size} files" if size > 2 else ""
+        for spans in runs:
+            a_start = min(s[0] for s in spans)
+            a_end = max(s[1] for s in spans)
+            b_start = min(s[2] for s in spans)
+            b_end = max(s[3] for s in spans)
+            sides = [(path_a, (a_start, a_end), path_b, (b_start, b_end))]
+            if path_a != path_b:
+                sides.append((path_b, (b_start, b_end), path_a, (a_start, a_end)))
+            for here, (start, end), there, (other_start, other_end) in sides:
+                other = os.path.relpath(there, root) if root else there
+                suggestions.append({
+                    "file": here,
+                    "line": start,
+                    "message": (
+                        f"{DUPLICATE_MSG_ID}: Similar code in lines {start}-{end} and "
+                        f"{other}:{other_start}-{other_end} ({len(spans)} shared fingerprints{cluster})"
+                    ),
+                    "code": DUPLICATE_CODE,
+                    "type": categorize_lint(DUPLICATE_MSG_ID),
+                })
+    suggestions.sort(key=lambda s: (s["file"], s["line"]))
+    return suggestions
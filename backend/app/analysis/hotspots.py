@@ -0,0 +1,231 @@
+# backend/app/analysis/hotspots.py
+
+import ast
+import math
+import os
+import subprocess
+import threading
+from collections import OrderedDict, defaultdict
+
+from app.config import HOTSPOT_CHURN_SINCE, HOTSPOT_TOP_N
+from app.github.parser import iter_python_paths, tree_fingerprint
+
+MAX_CACHED_REPORTS = 16
+
+# blocks that make the code inside them one level deeper
+NESTING_NODES = (ast.For, ast.AsyncFor, ast.While, ast.Try, ast.With, ast.AsyncWith) + (
+    (ast.TryStar,) if hasattr(ast, "TryStar") else ()
+) + ((ast.Match,) if hasattr(ast, "Match") else ())
+
+
+class FunctionMetrics(ast.NodeVisitor):
+    """
+    Collects per-function cyclomatic complexity, maximum nesting depth and size
+    in one pass over a module. Nested functions are measured on their own and
+    don't add to their parent.
+    """
+
+    def __init__(self):
+        self.functions = []
+        self._open = []
+        self._scope = []
+
+    def _branch(self, amount: int = 1):
+        if self._open:
+            self._open[-1]["complexity"] += amount
+
+    def _visit_nested(self, nodes):
+        record = self._open[-1] if self._open else None
+        if record is not None:
+            record["_depth"] += 1
+            record["nesting"] = max(record["nesting"], record["_depth"])
+        for node in nodes:
+            self.visit(node)
+        if record is not None:
+            record["_depth"] -= 1
+
+    def _visit_function(self, node):
+        record = {
+            "name": ".".join(self._scope + [node.name]),
+            "line": node.lineno,
+            "end_line": node.end_lineno,
+            "size": node.end_lineno - node.lineno + 1,
+            "complexity": 1,
+            "nesting": 0,
+            "_depth": 0,
+        }
+        self._open.append(record)
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+        self._open.pop()
+        del record["_depth"]
+        self.functions.append(record)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node):
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_If(self, node):
+        self._branch()
+        self.visit(node.test)
+        self._visit_nested(node.body)
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            # elif: a sibling branch, not a deeper level
+            self.visit(node.orelse[0])
+        elif node.orelse:
+            self._visit_nested(node.orelse)
+
+    def generic_visit(self, node):
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While, ast.IfExp, ast.ExceptHandler)):
+            self._branch()
+        elif isinstance(node, ast.BoolOp):
+            self._branch(len(node.values) - 1)
+        elif isinstance(node, ast.comprehension):
+            self._branch(1 + len(node.ifs))
+        elif hasattr(ast, "match_case") and isinstance(node, ast.match_case):
+            self._branch()
+
+        if isinstance(node, NESTING_NODES):
+            self._visit_nested(ast.iter_child_nodes(node))
+        else:
+            super().generic_visit(node)
+
+
+def function_metrics(code: str) -> list:
+    """Returns the metrics of every function and method in a module, or [] if it doesn't parse."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+    visitor = FunctionMetrics()
+    visitor.visit(tree)
+    return visitor.functions
+
+
+def git_churn(root: str, since: str = HOTSPOT_CHURN_SINCE) -> dict:
+    """
+    Returns {relative path: {"commits": n, "churn": lines added + deleted}} for
+    the files under `root`, from a single `git log --numstat`. Empty when
+    `root` isn't inside a git checkout (e.g. an archive download).
+    """
+    command = ["git", "log", "--numstat", "--relative", "--no-renames", "--format=%x00"]
+    if since:
+        command.append(f"--since={since}")
+    try:
+        result = subprocess.run(command, cwd=root, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Could not read git history of {root}: {e}")
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    churn = defaultdict(lambda: {"commits": 0, "churn": 0})
+    for line in result.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 3:
+            continue
+        added, deleted, path = parts
+        stats = churn[path]
+        stats["commits"] += 1
+        # binary files report "-" for both counts
+        stats["churn"] += (int(added) if added.isdigit() else 0) + (int(deleted) if deleted.isdigit() else 0)
+    return dict(churn)
+
+
+def git_head(root: str):
+    """Returns the commit checked out at `root`, or None outside a git checkout."""
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def churn_status(root: str) -> str:
+    """
+    How much history git_churn can see under `root`: "available", "shallow"
+    (a --depth=1 clone, every file looks touched once) or "unavailable" (no
+    git checkout, e.g. an archive download). Without history the ranking is
+    by complexity alone.
+    """
+    if git_head(root) is None:
+        return "unavailable"
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--is-shallow-repository"], cwd=root, capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return "available"
+    return "shallow" if result.stdout.strip() == "true" else "available"
+
+
+def risk_score(function: dict, commits: int) -> float:
+    """
+    Complexity, inflated for deep nesting and long bodies, multiplied by how
+    often the file changes. Rarely-touched complex code ranks below complex
+    code that keeps getting edited.
+    """
+    shape = function["complexity"] + 2 * max(function["nesting"] - 1, 0)
+    size = math.log2(2 + function["size"] / 10)
+    return round(shape * size * (1 + math.log1p(commits)), 2)
+
+
+def rank_hotspots(root: str, since: str = HOTSPOT_CHURN_SINCE) -> list:
+    """Measures every function under `root` and returns them all, riskiest first."""
+    churn = git_churn(root, since)
+    hotspots = []
+    for path in iter_python_paths(root):
+        rel_path = os.path.relpath(path, root)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        file_churn = churn.get(rel_path.replace(os.sep, "/"), {"commits": 0, "churn": 0})
+        for function in function_metrics(code):
+            function.update({"file": rel_path, **file_churn})
+            function["score"] = risk_score(function, file_churn["commits"])
+            hotspots.append(function)
+    hotspots.sort(key=lambda h: (-h["score"], h["file"], h["line"]))
+    return hotspots
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def find_hotspots(root: str, top: int = HOTSPOT_TOP_N, since: str = HOTSPOT_CHURN_SINCE) -> list:
+    """
+    Returns the `top` riskiest functions under `root` (all of them if top is
+    0 or None). The full ranking is cached per snapshot of the tree.
+    """
+    root = os.path.abspath(root)
+    key = (root, since, tree_fingerprint(root))
+    with _cache_lock:
+        ranked = _cache.get(key)
+        if ranked is not None:
+            _cache.move_to_end(key)
+    if ranked is None:
+        ranked = rank_hotspots(root, since)
+        with _cache_lock:
+            _cache[key] = ranked
+            while len(_cache) > MAX_CACHED_REPORTS:
+                _cache.popitem(last=False)
+    return [dict(h) for h in (ranked[:top] if top else ranked)]
+
+
+def hotspot_spans(hotspots: list) -> dict:
+    """Groups hotspots into {relative path: [(start, end), ...]} for line lookups."""
+    spans = defaultdict(list)
+    for h in hotspots:
+        spans[h["file"]].append((h["line"], h["end_line"]))
+    return dict(spans)
+
+
+def in_spans(line: int, spans: list) -> bool:
+    return any(start <= line <= end for start, end in spans)
@@ -0,0 +1,180 @@
+# backend/app/analysis/import_graph.py
+
+import ast
+import os
+import threading
+from collections import OrderedDict, deque
+
+from app.github.parser import walk_python_files, tree_fingerprint
+
+# Number of repo snapshots whose graphs are kept in memory
+MAX_CACHED_GRAPHS = 8
+
+
+class ImportGraph:
+    """
+    File-level import graph of a Python tree. Nodes are paths relative to the
+    root; an edge a -> b means a imports b.
+    """
+
+    def __init__(self, root: str, files: list):
+        self.root = root
+        self.nodes = set()
+        self.imports = {}
+        self.imported_by = {}
+        self._pagerank = None
+        # set when the root itself is a package, e.g. graphing site-packages/requests
+        self.package_name = os.path.basename(os.path.normpath(root)) if os.path.exists(os.path.join(root, "__init__.py")) else None
+
+        parsed = []
+        for f in files:
+            rel = os.path.relpath(f["path"], root)
+            self.nodes.add(rel)
+            self.imports[rel] = set()
+            self.imported_by[rel] = set()
+            if f.get("ast") is not None:
+                parsed.append((rel, f["ast"]))
+
+        for rel, tree in parsed:
+            for target in self._imports_of(rel, tree):
+                if target != rel:
+                    self.imports[rel].add(target)
+                    self.imported_by[target].add(rel)
+
+    # --- resolution -------------------------------------------------------
+
+    def _module_file(self, base_dir: str, parts: list):
+        """Returns the file for module `parts` under `base_dir`, if it is part of the tree."""
+        if not parts:
+            init = os.path.join(base_dir, "__init__.py")
+            return os.path.normpath(init) if os.path.normpath(init) in self.nodes else None
+        stem = os.path.join(base_dir, *parts)
+        for candidate in (stem + ".py", os.path.join(stem, "__init__.py")):
+            candidate = os.path.normpath(candidate)
+            if candidate in self.nodes:
+                return candidate
+        return None
+
+    def _resolve_absolute(self, importer: str, parts: list):
+        # Try the importer's ancestors as source roots, outermost first, so both
+        # "backend/main.py -> app.x" and "src/pkg/a.py -> pkg.b" resolve.
+        # Regular packages (with __init__.py) can't be roots, which keeps
+        # "import json" from matching a sibling json.py.
+        ancestors = []
+        directory = os.path.dirname(importer)
+        while True:
+            if not directory or os.path.join(directory, "__init__.py") not in self.nodes:
+                ancestors.append(directory)
+            if not directory:
+                break
+            directory = os.path.dirname(directory)
+        if parts[0] == self.package_name:
+            # the tree root is itself the package being imported
+            parts = parts[1:]
+            ancestors = [""]
+        for root in reversed(ancestors):
+            for length in range(len(parts), 0, -1):
+                target = self._module_file(root, parts[:length])
+                if target:
+                    return target
+            if not parts:
+                return self._module_file(root, [])
+        return None
+
+    def _imports_of(self, rel: str, tree):
+        package_dir = os.path.dirname(rel)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    target = self._resolve_absolute(rel, alias.name.split("."))
+                    if target:
+                        yield target
+            elif isinstance(node, ast.ImportFrom):
+                module_parts = node.module.split(".") if node.module else []
+                if node.level:
+                    base = package_dir
+                    for _ in range(node.level - 1):
+                        base = os.path.dirname(base)
+                    resolve = lambda parts: self._module_file(base, parts)
+                else:
+                    resolve = lambda parts: self._resolve_absolute(rel, parts) if parts else None
+                for alias in node.names:
+                    # "from pkg import mod" imports a submodule when one exists
+                    target = resolve(module_parts + [alias.name]) if alias.name != "*" else None
+                    target = target or resolve(module_parts)
+                    if target:
+                        yield target
+
+    # --- queries ----------------------------------------------------------
+
+    def in_degree(self, top: int = 20) -> list:
+        ranked = sorted(self.nodes, key=lambda n: (-len(self.imported_by[n]), n))
+        return [(n, len(self.imported_by[n])) for n in ranked[:top]]
+
+    def pagerank(self, damping: float = 0.85, iterations: int = 50, tol: float = 1e-6) -> dict:
+        if self._pagerank is not None:
+            return self._pagerank
+        n = len(self.nodes)
+        if not n:
+            return {}
+        rank = {node: 1.0 / n for node in self.nodes}
+        for _ in range(iterations):
+            # rank held by files that import nothing is spread evenly
+            dangling = sum(rank[node] for node in self.nodes if not self.imports[node])
+            new_rank = {}
+            for node in self.nodes:
+                incoming = sum(rank[src] / len(self.imports[src]) for src in self.imported_by[node])
+                new_rank[node] = (1 - damping) / n + damping * (incoming + dangling / n)
+            delta = sum(abs(new_rank[node] - rank[node]) for node in self.nodes)
+            rank = new_rank
+            if delta < tol:
+                break
+        self._pagerank = rank
+        return rank
+
+    def top_by_pagerank(self, top: int = 20) -> list:
+        rank = self.pagerank()
+        return sorted(rank.items(), key=lambda item: (-item[1], item[0]))[:top]
+
+    def _closure(self, start: str, edges: dict) -> list:
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for nxt in edges.get(queue.popleft(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        seen.discard(start)
+        return sorted(seen)
+
+    def dependencies(self, rel: str, transitive: bool = False) -> list:
+        return self._closure(rel, self.imports) if transitive else sorted(self.imports.get(rel, ()))
+
+    def dependents(self, rel: str, transitive: bool = False) -> list:
+        """Files affected by a change to `rel` (reverse dependencies)."""
+        return self._closure(rel, self.imported_by) if transitive else sorted(self.imported_by.get(rel, ()))
+
+    def normalize(self, path: str):
+        """Maps an absolute or root-relative path onto a node name, or None."""
+        rel = os.path.normpath(os.path.relpath(path, self.root) if os.path.isabs(path) else path)
+        return rel if rel in self.nodes else None
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_import_graph(root: str) -> ImportGraph:
+    """Builds (or reuses) the import graph for the current snapshot of `root`."""
+    root = os.path.abspath(root)
+    key = (root, tree_fingerprint(root))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    graph = ImportGraph(root, walk_python_files(root))
+    with _cache_lock:
+        _cache[key] = graph
+        while len(_cache) > MAX_CACHED_GRAPHS:
+            _cache.popitem(last=False)
+    return graph
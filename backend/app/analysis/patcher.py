@@ -4,6 +4,8 @@ import difflib
 from pathlib import Path
 import subprocess
 
+from app.github.worktree import replace_file
+
 def generate_patch(old_code: str, new_code: str, file_path: str) -> str:
     old_lines = old_code.splitlines(keepends=True)
     new_lines = new_code.splitlines(keepends=True)
@@ -35,7 +37,7 @@ def apply_patch_to_file(file_path: str, patch_text: str) -> str:
             return "Patch does not introduce any changes."
         
         new_content = "".join(patched_lines)
-        path.write_text(new_content, encoding="utf-8")
+        replace_file(str(path), new_content)
 
         return f"Patch applied successfully to {file_path}"
     except Exception as e:
@@ -1,26 +1,39 @@
 # backend/app/analysis/suggester.py
 
+import base64
+import fnmatch
+import os
 import re
-from typing import List, Dict
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
 from app.agent.core import GitHubChatModel
 from langchain_core.messages import HumanMessage
+from app.analysis.patcher import generate_patch as make_unified_diff
+from app.analysis.linter import run_pylint
+from app.analysis.hotspots import find_hotspots, hotspot_spans, in_spans
+from app.github.parser import iter_python_paths, parse_python_file
+
+MSG_ID = re.compile(r"([CRWEFI]\d{4}):")
 
 def parse_pylint_output(output: str) -> List[Dict]:
     suggestions = []
     lines = output.strip().split("\n")
 
     for line in lines:
-        # Pylint typical format: path:line:col: message (error code)
-        match = re.match(r"(.+?):(\d+):\d+: (.+?) \((.+?)\)", line)
+        # Pylint typical format: path:line:col: message (symbolic-name); the message itself may contain parentheses
+        match = re.match(r"(.+?):(\d+):\d+: (.+) \(([a-z0-9-]+)\)$", line.rstrip())
         if match:
             file_path, line_num, message, code = match.groups()
+            # the message starts with the message id ("W0611: Unused import os"),
+            # which is what carries the category; `code` is the symbolic name
+            msg_id = MSG_ID.match(message)
             suggestions.append({
                 "file": file_path.strip(),
                 "line": int(line_num),
                 "message": message.strip(),
                 "code": code,
-                "type": categorize_lint(code)
+                "type": categorize_lint(msg_id.group(1) if msg_id else code)
             })
     return suggestions
 
@@ -35,8 +48,115 @@ def categorize_lint(code: str) -> str:
         return "Refactor"
     else:
         return "Info"
-    
-def generate_patch(file_path: str, issues: str) -> str:
+
+def encode_cursor(rel_path: str, index: int) -> str:
+    return base64.urlsafe_b64encode(f"{rel_path}\0{index}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Inverse of encode_cursor. Raises ValueError for anything encode_cursor couldn't have produced."""
+    try:
+        rel_path, index = base64.urlsafe_b64decode(cursor.encode()).decode().split("\0", 1)
+        index = int(index)
+    except ValueError:
+        # binascii.Error and UnicodeDecodeError are ValueErrors too
+        raise ValueError(f"Invalid cursor: {cursor!r}") from None
+    if index < 0:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return rel_path, index
+
+DUPLICATES_CURSOR_KEY = "\uffff"
+
+def iter_suggestions(
+    directory: str,
+    types: Optional[List[str]] = None,
+    codes: Optional[List[str]] = None,
+    path_glob: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_duplicates: bool = False,
+    hotspots: Optional[int] = None,
+) -> Iterator[tuple]:
+    """
+    Lints the tree file by file and yields (next_cursor, suggestion) as soon as
+    each file is done. Files are visited in sorted order so a cursor taken from
+    one page resumes exactly after the last suggestion returned. Path filters
+    are applied before linting, so filtered-out files cost nothing.
+    With include_duplicates, copy-paste findings across the whole (filtered)
+    tree follow the per-file lint results.
+    With hotspots=N, only files and lines inside the N riskiest functions
+    (see app/analysis/hotspots.py) are linted and reported.
+    """
+    paths = sorted(
+        (os.path.relpath(path, directory), path) for path in iter_python_paths(directory)
+    )
+    start_file, skip = decode_cursor(cursor) if cursor else ("", 0)
+
+    spans = None
+    if hotspots:
+        spans = hotspot_spans(find_hotspots(directory, top=hotspots))
+
+    def keep(suggestion):
+        if types and suggestion["type"] not in types:
+            return False
+        if codes and suggestion["code"] not in codes and suggestion["message"].split(":", 1)[0] not in codes:
+            return False
+        return True
+
+    sources = []
+    for rel_path, path in paths:
+        if path_glob and not (fnmatch.fnmatch(rel_path, path_glob) or fnmatch.fnmatch(path, path_glob)):
+            continue
+        if rel_path < start_file and not include_duplicates:
+            continue
+        if spans is not None and rel_path not in spans and not include_duplicates:
+            continue
+        parsed = parse_python_file(path)
+        if parsed.get("error") is not None:
+            continue
+        if include_duplicates:
+            sources.append({"path": path, "code": parsed["code"]})
+        if rel_path < start_file or (spans is not None and rel_path not in spans):
+            continue
+
+        lint = run_pylint(path)
+        index = 0
+        for suggestion in parse_pylint_output(lint["output"]):
+            if not keep(suggestion):
+                continue
+            if spans is not None and not in_spans(suggestion["line"], spans[rel_path]):
+                continue
+            index += 1
+            if rel_path == start_file and index <= skip:
+                continue
+            yield encode_cursor(rel_path, index), suggestion
+
+    if include_duplicates:
+        from app.analysis.duplicates import find_duplicates
+        index = 0
+        for suggestion in find_duplicates(sources):
+            if not keep(suggestion):
+                continue
+            index += 1
+            if start_file == DUPLICATES_CURSOR_KEY and index <= skip:
+                continue
+            yield encode_cursor(DUPLICATES_CURSOR_KEY, index), suggestion
+
+def summarize_suggestions(suggestions: Iterable[Dict]) -> Dict:
+    """Counts suggestions per code, per directory and per category in a single pass."""
+    by_code, by_directory, by_type = Counter(), Counter(), Counter()
+    total = 0
+    for suggestion in suggestions:
+        total += 1
+        by_code[suggestion["code"]] += 1
+        by_directory[os.path.dirname(suggestion["file"]) or "."] += 1
+        by_type[suggestion["type"]] += 1
+    return {
+        "total": total,
+        "by_code": dict(by_code.most_common()),
+        "by_directory": dict(by_directory.most_common()),
+        "by_type": dict(by_type.most_common()),
+    }
+
+def generate_patch(file_path: str, issues: str, priority: str = "interactive") -> str:
     """
     Given a file path and issue description, use the LLM to suggest a fix and return a patch.
     """
@@ -58,13 +178,63 @@ The following linting issue(s) were detected:
 
 Please return the full corrected version of the code after fixing the issue(s). Do not explain — just return the fixed code.
 """
-        llm = GitHubChatModel()
+        llm = GitHubChatModel(priority=priority)
         fixed_code = llm._call([HumanMessage(content=prompt)]).strip()
 
         if not fixed_code or fixed_code == original_code:
             return "No changes suggested by the model."
 
-        patch = generate_patch(original_code, fixed_code, file_path)
+        patch = make_unified_diff(original_code, fixed_code, file_path)
+        return patch or "Diff could not be generated. No differences found."
+
+    except Exception as e:
+        return f"Failed to generate patch: {e}"
+
+def _strip_code_fence(text: str) -> str:
+    lines = text.strip("\n").splitlines()
+    if lines and lines[0].startswith("```"):
+        lines = lines[1:]
+    if lines and lines[-1].startswith("```"):
+        lines = lines[:-1]
+    return "\n".join(lines)
+
+def generate_hunk_patch(file_path: str, start: int, end: int, issues: str, display_path: str = None, context: int = 3, priority: str = "interactive") -> str:
+    """
+    Like generate_patch, but only sends lines start..end (plus a few lines of context)
+    to the LLM and splices the fixed snippet back into the file before diffing.
+    """
+    display_path = display_path or file_path
+    try:
+        path = Path(file_path)
+        if not path.exists():
+            return f"❌ File not found: {file_path}"
+
+        original_code = path.read_text(encoding="utf-8", errors="ignore")
+        lines = original_code.splitlines(keepends=True)
+        lo = max(start - 1 - context, 0)
+        hi = min(end + context, len(lines))
+        snippet = "".join(lines[lo:hi])
+
+        prompt = f"""
+You are a senior software engineer assisting with code linting and fixing.
+
+Below are lines {lo + 1}-{hi} of `{display_path}`:
+```python
+{snippet}
+```
+The following linting issue(s) were detected in this range:
+{issues}
+
+Please return the corrected version of exactly these lines after fixing the issue(s). Do not explain — just return the fixed code.
+"""
+        llm = GitHubChatModel(priority=priority)
+        fixed_snippet = _strip_code_fence(llm._call([HumanMessage(content=prompt)]))
+
+        if not fixed_snippet.strip() or fixed_snippet == snippet.rstrip("\n"):
+            return "No changes suggested by the model."
+
+        fixed_code = "".join(lines[:lo]) + fixed_snippet + "\n" + "".join(lines[hi:])
+        patch = make_unified_diff(original_code, fixed_code, display_path)
         return patch or "Diff could not be generated. No differences found."
 
     except Exception as e:
@@ -1,4 +1,61 @@
 import os
+import tempfile
 
-GITHUB_API_URL = "https://api.github.com"
-GITHUB_TOKEN = os.getenv("GITHUB_API_TOKEN")
\ No newline at end of file
+# Upstream base URLs, overridable so tests and the load harness can point at local fakes
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_WEB_URL = os.getenv("GITHUB_WEB_URL", "https://github.com")
+GITHUB_TOKEN = os.getenv("GITHUB_API_TOKEN")
+
+# Batch review concurrency limits (network / CPU / LLM stages)
+BATCH_CLONE_CONCURRENCY = int(os.getenv("BATCH_CLONE_CONCURRENCY", "4"))
+BATCH_LINT_CONCURRENCY = int(os.getenv("BATCH_LINT_CONCURRENCY", str(os.cpu_count() or 2)))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "2"))
+
+# LLM scheduler (see app/agent/scheduler.py)
+LLM_API_URL = os.getenv("LLM_API_URL", "https://models.github.ai/inference/chat/completions")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_PER_TOKEN_CONCURRENCY = int(os.getenv("LLM_PER_TOKEN_CONCURRENCY", "4"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+# 0 disables request pacing
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "1"))
+LLM_BURST = float(os.getenv("LLM_BURST", "5"))
+
+# Conversation memory (see app/agent/memory.py)
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH", os.path.join(tempfile.gettempdir(), "code-review-memory.sqlite3"))
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "1500"))
+MEMORY_TTL_SECONDS = int(os.getenv("MEMORY_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Hail Mary file-tree summary (see app/github/tree_summary.py)
+TREE_SUMMARY_TOKEN_BUDGET = int(os.getenv("TREE_SUMMARY_TOKEN_BUDGET", "2000"))
+TREE_SUMMARY_MAX_FILES = int(os.getenv("TREE_SUMMARY_MAX_FILES", "200000"))
+
+# Leased workspaces for clones and patches (see app/github/workspace.py)
+WORKSPACE_ROOT = os.getenv("WORKSPACE_ROOT", os.path.join(tempfile.gettempdir(), "code-review-workspaces"))
+WORKSPACE_QUOTA_BYTES = int(os.getenv("WORKSPACE_QUOTA_BYTES", str(2 * 1024 ** 3)))
+# Charged against the global quota for a new lease until its usage has been measured
+WORKSPACE_RESERVATION_BYTES = int(os.getenv("WORKSPACE_RESERVATION_BYTES", str(256 * 1024 ** 2)))
+WORKSPACE_GLOBAL_QUOTA_BYTES = int(os.getenv("WORKSPACE_GLOBAL_QUOTA_BYTES", str(20 * 1024 ** 3)))
+WORKSPACE_TTL_SECONDS = int(os.getenv("WORKSPACE_TTL_SECONDS", "3600"))
+WORKSPACE_SWEEP_INTERVAL = int(os.getenv("WORKSPACE_SWEEP_INTERVAL", "60"))
+
+# Copy-on-write session overlays (see app/github/worktree.py)
+WORKTREE_QUOTA_BYTES = int(os.getenv("WORKTREE_QUOTA_BYTES", str(256 * 1024 ** 2)))
+WORKTREE_RESERVATION_BYTES = int(os.getenv("WORKTREE_RESERVATION_BYTES", str(8 * 1024 ** 2)))
+
+# Speculative repo prefetch (see app/github/prefetch.py). By default snapshots
+# may fill at most half the global workspace budget even at their full quota.
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+PREFETCH_MAX_SNAPSHOTS = int(os.getenv(
+    "PREFETCH_MAX_SNAPSHOTS",
+    str(max(1, min(8, WORKSPACE_GLOBAL_QUOTA_BYTES // (2 * WORKSPACE_QUOTA_BYTES)))),
+))
+PREFETCH_TTL_SECONDS = int(os.getenv("PREFETCH_TTL_SECONDS", "900"))
+
+# Complexity/churn hotspots (see app/analysis/hotspots.py)
+HOTSPOT_TOP_N = int(os.getenv("HOTSPOT_TOP_N", "20"))
+HOTSPOT_CHURN_SINCE = os.getenv("HOTSPOT_CHURN_SINCE", "12 months ago")
+
+# Cached, precompressed analysis responses (see app/utils/response_cache.py)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "64"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 ** 2)))
@@ -1,7 +1,7 @@
 import httpx
 import re
 
-GITHUB_API_URL = "https://api.github.com"
+from app.config import GITHUB_API_URL
 
 def parse_github_url(url: str):
     """
@@ -18,6 +18,12 @@ def parse_github_url(url: str):
     
     return owner, repo
 
+def _auth_headers(token: str = None, accept: str = "application/vnd.github+json"):
+    headers = {"Accept": accept}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
 def get_repo_contents(owner: str, repo: str, path: str = ""):
     url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}"
     response = httpx.get(url)
@@ -35,3 +41,49 @@ def get_repo_metadata(owner: str, repo: str):
     response = httpx.get(url)
     response.raise_for_status()
     return response.json()
+
+def get_pull_request(owner: str, repo: str, number: int, token: str = None):
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/pulls/{number}"
+    response = httpx.get(url, headers=_auth_headers(token))
+    response.raise_for_status()
+    return response.json()
+
+def get_pull_request_files(owner: str, repo: str, number: int, token: str = None):
+    """
+    Returns every file entry of a PR (filename, status, patch, ...), following pagination.
+    """
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/pulls/{number}/files"
+    files = []
+    page = 1
+    while True:
+        response = httpx.get(url, headers=_auth_headers(token), params={"per_page": 100, "page": page})
+        response.raise_for_status()
+        batch = response.json()
+        files.extend(batch)
+        if len(batch) < 100:
+            return files
+        page += 1
+
+def compare_refs(owner: str, repo: str, base: str, head: str, token: str = None):
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/compare/{base}...{head}"
+    response = httpx.get(url, headers=_auth_headers(token))
+    response.raise_for_status()
+    return response.json()
+
+def resolve_ref(owner: str, repo: str, ref: str, token: str = None) -> str:
+    """
+    Returns the commit SHA a branch, tag or SHA currently points to.
+    """
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{ref}"
+    response = httpx.get(url, headers=_auth_headers(token, "application/vnd.github.sha"))
+    response.raise_for_status()
+    return response.text.strip()
+
+def get_file_at_ref(owner: str, repo: str, path: str, ref: str, token: str = None) -> bytes:
+    """
+    Fetches the raw bytes of a single file at the given ref.
+    """
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/contents/{path}"
+    response = httpx.get(url, headers=_auth_headers(token, "application/vnd.github.raw"), params={"ref": ref})
+    response.raise_for_status()
+    return response.content
@@ -1,53 +1,69 @@
 import os
-import shutil
-import tempfile
 import subprocess
+import zipfile
 import requests
 from urllib.parse import urlparse
+from app.config import GITHUB_WEB_URL
 from app.github.client import parse_github_url
+from app.github.workspace import QuotaExceeded, Workspace
 
-def download_public_repo(repo_url: str, branch="main") -> str:
+def download_public_repo(repo_url: str, workspace: Workspace, branch="main") -> str:
     owner, repo = parse_github_url(repo_url)
-    zip_url = f"https://github.com/{owner}/{repo}/archive/refs/heads/{branch}.zip"
+    zip_url = f"{GITHUB_WEB_URL}/{owner}/{repo}/archive/refs/heads/{branch}.zip"
 
-    tmp_dir = tempfile.mkdtemp()
-    zip_path = os.path.join(tmp_dir, f"{repo}.zip")
+    zip_path = os.path.join(workspace.path, f"{repo}.zip")
 
-    with requests.get(zip_url, stream=True) as r:
-        r.raise_for_status()
-        with open(zip_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    try:
+        with requests.get(zip_url, stream=True) as r:
+            r.raise_for_status()
+            workspace.check_quota(int(r.headers.get("Content-Length") or 0))
+            written = 0
+            with open(zip_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=8192):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if written > workspace.quota_bytes:
+                        workspace.check_quota()
 
-    shutil.unpack_archive(zip_path, tmp_dir)
-    os.remove(zip_path)
+        with zipfile.ZipFile(zip_path) as archive:
+            # refuse archives that would blow the quota before extracting anything
+            uncompressed = sum(info.file_size for info in archive.infolist())
+            if uncompressed > workspace.quota_bytes:
+                raise QuotaExceeded(
+                    f"{repo_url} unpacks to {uncompressed} bytes, workspace quota is {workspace.quota_bytes}"
+                )
+            archive.extractall(workspace.path)
+    finally:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+    workspace.check_quota()
 
-    extracted_path = os.path.join(tmp_dir, f"{repo}-{branch}")
+    extracted_path = os.path.join(workspace.path, f"{repo}-{branch}")
     return extracted_path
 
-def clone_private_repo(repo_url: str, github_token: str) -> str:
-    tmp_dir = tempfile.mkdtemp()
+def clone_private_repo(repo_url: str, github_token: str, workspace: Workspace) -> str:
+    target = os.path.join(workspace.path, "repo")
     parsed = urlparse(repo_url)
     url_with_auth = f"https://{github_token}@{parsed.netloc}{parsed.path}"
 
     subprocess.run(
-        ["git", "clone", "--depth=1", url_with_auth, tmp_dir],
+        ["git", "clone", "--depth=1", url_with_auth, target],
         check=True
     )
+    workspace.check_quota()
 
-    return tmp_dir
+    return target
 
-def clone_repo_from_url(repo_url: str, target_path: str) -> None:
+def clone_repo_from_url(repo_url: str, workspace: Workspace) -> str:
     """
-    Clone a public or private GitHub repo into the given target path.
+    Clone a public or private GitHub repo into the given workspace and return its path.
     Will use requests+unzip for public, and `git clone` for private (token via env).
     """
     try:
         # Try public clone first
-        extracted_path = download_public_repo(repo_url)
-
-        # Move contents to target_path
-        shutil.copytree(extracted_path, target_path, dirs_exist_ok=True)
+        return download_public_repo(repo_url, workspace)
+    except QuotaExceeded:
+        raise
     except Exception as public_error:
         # If public clone fails, try private clone (requires GITHUB_API_TOKEN in env)
         github_token = os.environ.get("GITHUB_API_TOKEN")
@@ -55,7 +71,6 @@ def clone_repo_from_url(repo_url: str, target_path: str) -> None:
             raise RuntimeError("Failed to clone repo publicly, and no GITHUB_API_TOKEN set for private clone.") from public_error
 
         try:
-            tmp_dir = clone_private_repo(repo_url, github_token)
-            shutil.copytree(tmp_dir, target_path, dirs_exist_ok=True)
+            return clone_private_repo(repo_url, github_token, workspace)
         except Exception as private_error:
             raise RuntimeError("Failed to clone GitHub repo (public and private attempts failed).") from private_error
@@ -3,6 +3,7 @@
 from pathlib import Path
 import subprocess
 from app.github.client import parse_github_url
+from app.config import GITHUB_API_URL
 from github import Github
 import base64
 import httpx
@@ -97,7 +98,7 @@ def update_file(
     }
 
     # Step 1: Get the file's current SHA
-    file_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{file_path}?ref={branch}"
+    file_url = f"{GITHUB_API_URL}/repos/{repo_owner}/{repo_name}/contents/{file_path}?ref={branch}"
     resp = httpx.get(file_url, headers=headers)
     if resp.status_code != 200:
         raise Exception(f"Failed to fetch file metadata: {resp.status_code} {resp.text}")
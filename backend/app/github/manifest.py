@@ -0,0 +1,135 @@
+# backend/app/github/manifest.py
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.github.tree_summary import SKIP_DIRS
+
+MAX_CACHED_MANIFESTS = 32
+
+
+@lru_cache(maxsize=256)
+def glob_regex(pattern: str):
+    """
+    Compiles a path glob: '*' and '?' stay within one path segment, '**'
+    spans any number of directories (so 'app/**/*.ts' also matches
+    'app/main.ts') and [...] is a character class.
+    """
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end].replace("\\", "\\\\")
+            out.append("[" + ("^" + body[1:] if body.startswith("!") else body) + "]")
+            i = end + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+class FileManifest:
+    """
+    Sorted list of every file under a repo root (relative path and size),
+    built with one directory walk that skips SKIP_DIRS. Queries filter and
+    page this list in memory instead of touching the disk again.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.entries = []
+        for current, dirs, files in os.walk(self.root):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            rel_dir = os.path.relpath(current, self.root)
+            for name in files:
+                rel_path = name if rel_dir == "." else f"{rel_dir}/{name}".replace(os.sep, "/")
+                try:
+                    size = os.stat(os.path.join(current, name), follow_symlinks=False).st_size
+                except OSError:
+                    continue
+                self.entries.append((rel_path, size))
+        self.entries.sort()
+
+    def query(self, pattern: str = None, contains: str = None, under: str = None) -> list:
+        """
+        Entries matching all given filters: a glob (matched against the whole
+        relative path, or just the file name if it has no '/'; see glob_regex),
+        a case-insensitive substring, and a directory prefix.
+        """
+        needle = contains.lower() if contains else None
+        regex = glob_regex(pattern) if pattern else None
+        prefix = under.strip("/") + "/" if under and under.strip("/") else None
+        matches = []
+        for rel_path, size in self.entries:
+            if prefix and not rel_path.startswith(prefix):
+                continue
+            if needle and needle not in rel_path.lower():
+                continue
+            if pattern:
+                target = rel_path if "/" in pattern else rel_path.rsplit("/", 1)[-1]
+                if not regex.match(target):
+                    continue
+            matches.append((rel_path, size))
+        return matches
+
+    def rollup(self, entries: list, under: str = None, depth: int = 1) -> list:
+        """
+        Groups entries into the directories `depth` levels below `under`.
+        Returns [(directory, file count, total bytes)]; files directly in
+        `under` are grouped as ".".
+        """
+        base = under.strip("/") if under else ""
+        skip = len(base.split("/")) if base else 0
+        groups = OrderedDict()
+        for rel_path, size in entries:
+            parts = rel_path.split("/")[skip:-1]
+            key = "/".join(([base] if base else []) + parts[:depth]) or "."
+            count, total = groups.get(key, (0, 0))
+            groups[key] = (count + 1, total + size)
+        return [(key, count, total) for key, (count, total) in sorted(groups.items())]
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_manifest(root: str, refresh: bool = False) -> FileManifest:
+    """Returns the manifest for a workspace root, building it on first use."""
+    root = os.path.abspath(root)
+    with _cache_lock:
+        manifest = _cache.get(root)
+        if manifest is not None and not refresh:
+            _cache.move_to_end(root)
+            return manifest
+    manifest = FileManifest(root)
+    with _cache_lock:
+        _cache[root] = manifest
+        while len(_cache) > MAX_CACHED_MANIFESTS:
+            _cache.popitem(last=False)
+    return manifest
+
+
+def invalidate_manifests(path: str):
+    """Drops the cached manifest of every root containing `path`, after a file there was written."""
+    path = os.path.realpath(path)
+    with _cache_lock:
+        for root in list(_cache):
+            real_root = os.path.realpath(root)
+            if path == real_root or path.startswith(real_root + os.sep):
+                del _cache[root]
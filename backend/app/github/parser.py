@@ -2,23 +2,63 @@
 
 import os
 import ast
+import hashlib
+import io
+import tokenize
 
 def parse_python_file(file_path):
-    """Parses a Python file and returns its AST and raw code."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        code = f.read()
+    """
+    Parses a Python file and returns its AST and raw code. The file is decoded
+    the way Python would (PEP 263 coding cookie, UTF-8 by default), with
+    undecodable bytes replaced; files that can't be read or parsed come back
+    with an "error" instead of raising, so one bad file doesn't abort a walk.
+    """
     try:
-        tree = ast.parse(code, filename=file_path)
+        with open(file_path, "rb") as f:
+            source = f.read()
+    except OSError as e:
+        return {"path": file_path, "ast": None, "code": "", "error": f"OSError: {e.strerror}"}
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+    except SyntaxError:
+        encoding = "utf-8"
+    code = source.decode(encoding, errors="replace")
+    try:
+        tree = ast.parse(source, filename=file_path)
         return {"path": file_path, "ast": tree, "code": code}
     except SyntaxError:
+        pass
+    except ValueError:
+        # e.g. null bytes
+        return {"path": file_path, "ast": None, "code": code, "error": "ValueError"}
+    # source that isn't valid in its declared encoding may still parse once the bad bytes are replaced
+    try:
+        return {"path": file_path, "ast": ast.parse(code, filename=file_path), "code": code, "decode_errors": True}
+    except (SyntaxError, ValueError):
         return {"path": file_path, "ast": None, "code": code, "error": "SyntaxError"}
 
-def walk_python_files(directory):
-    """Walks through a directory and parses all .py files."""
-    results = []
+def iter_python_paths(directory):
+    """Yields the path of every .py file under a directory, without parsing."""
     for root, _, files in os.walk(directory):
         for file in files:
             if file.endswith(".py"):
-                path = os.path.join(root, file)
-                results.append(parse_python_file(path))
-    return results
+                yield os.path.join(root, file)
+
+def walk_python_files(directory):
+    """Walks through a directory and parses all .py files."""
+    return [parse_python_file(path) for path in iter_python_paths(directory)]
+
+def tree_fingerprint(directory):
+    """
+    Cheap snapshot id for the Python files under a directory: a hash of every
+    relative path with its size and mtime. Changes whenever a .py file is
+    added, removed or modified.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(iter_python_paths(directory)):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"{os.path.relpath(path, directory)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
@@ -1,6 +1,8 @@
 import os
 from unidiff import PatchSet
 
+from app.github.worktree import replace_file
+
 def apply_patch_to_repo(repo_path: str, patch_str: str):
     patch = PatchSet(patch_str.splitlines(keepends=True))
     
@@ -14,5 +16,4 @@ def apply_patch_to_repo(repo_path: str, patch_str: str):
             end = start + hunk.source_length
             lines[start:end] = [l.value for l in hunk if l.is_added or l.is_context]
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+        replace_file(file_path, "".join(lines))
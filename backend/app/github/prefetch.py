@@ -0,0 +1,149 @@
+# backend/app/github/prefetch.py
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from app.config import PREFETCH_MAX_SNAPSHOTS, PREFETCH_TTL_SECONDS, PREFETCH_WORKERS
+from app.github.client import parse_github_url
+from app.github.clone import clone_repo_from_url
+from app.github.workspace import QuotaExceeded, Workspace, get_workspace_manager
+from app.github.worktree import close_worktrees_under
+
+
+class Snapshot:
+    def __init__(self, key: str, workspace: Workspace, future: Future):
+        self.key = key
+        self.workspace = workspace
+        self.future = future
+        self.created = time.monotonic()
+        # open_snapshot readers; a retired snapshot keeps its workspace until they're done
+        self.readers = 0
+        self.retired = False
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.created > PREFETCH_TTL_SECONDS
+
+    def failed(self) -> bool:
+        return self.future.done() and self.future.exception() is not None
+
+    def discard(self):
+        """Retires the snapshot. Called with _lock held."""
+        self.retired = True
+        if self.readers == 0:
+            self._release()
+
+    def close_reader(self):
+        """Called with _lock held when an open_snapshot block exits."""
+        self.readers -= 1
+        if self.retired and self.readers == 0:
+            self._release()
+
+    def _release(self):
+        # only release the workspace once nobody can still be cloning into it
+        self.future.add_done_callback(lambda _: self._delete())
+
+    def _delete(self):
+        close_worktrees_under(self.workspace.path)
+        self.workspace.release()
+
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+_snapshots = OrderedDict()
+_lock = threading.Lock()
+
+
+def repo_key(repo_url: str) -> str:
+    """Normalizes a repo URL so 'https://github.com/A/b.git' and '.../a/b/' share a snapshot."""
+    owner, repo = parse_github_url(repo_url.strip())
+    return f"{owner}/{repo}".lower()
+
+
+def _fetch(repo_url: str, workspace: Workspace, build_indexes: bool) -> str:
+    started = time.monotonic()
+    local_path = clone_repo_from_url(repo_url, workspace)
+    print(f"Prefetched {repo_url} in {time.monotonic() - started:.1f}s")
+    if build_indexes:
+        try:
+            from app.analysis.import_graph import get_import_graph
+            get_import_graph(local_path)
+        except Exception as e:
+            print(f"Index prebuild failed for {repo_url}: {e}")
+    return local_path
+
+
+def _current_snapshot(repo_url: str, build_indexes: bool) -> Snapshot:
+    """Returns the live snapshot of the repo, starting a fetch if needed. Called with _lock held."""
+    key = repo_key(repo_url)
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and not snapshot.expired() and not snapshot.failed():
+        _snapshots.move_to_end(key)
+        return snapshot
+    if snapshot is not None:
+        del _snapshots[key]
+        snapshot.discard()
+
+    # the lease outlives the snapshot's TTL so the sweeper never pulls it from under a reader
+    while True:
+        try:
+            workspace = get_workspace_manager().acquire("snapshot", ttl=PREFETCH_TTL_SECONDS * 2)
+            break
+        except QuotaExceeded:
+            # make room by retiring the least recently used snapshot nobody is reading
+            idle = next((k for k, s in _snapshots.items() if s.readers == 0 and s.future.done()), None)
+            if idle is None:
+                raise
+            _snapshots.pop(idle).discard()
+    snapshot = Snapshot(key, workspace, _executor.submit(_fetch, repo_url, workspace, build_indexes))
+    _snapshots[key] = snapshot
+    while len(_snapshots) > PREFETCH_MAX_SNAPSHOTS:
+        _, evicted = _snapshots.popitem(last=False)
+        evicted.discard()
+    return snapshot
+
+
+def prefetch_repo(repo_url: str, build_indexes: bool = False) -> Future:
+    """
+    Starts fetching a read-only snapshot of the repo in the background and
+    returns a future resolving to its local path. Repeated calls for the same
+    repo share one fetch while the snapshot is fresh.
+    """
+    with _lock:
+        return _current_snapshot(repo_url, build_indexes).future
+
+
+def get_snapshot(repo_url: str, timeout: float = None) -> str:
+    """
+    Returns the local path of a read-only snapshot of the repo, waiting on a
+    prefetch already in flight or starting one now. The path is not pinned,
+    so read from it through open_snapshot.
+    """
+    return prefetch_repo(repo_url).result(timeout=timeout)
+
+
+@contextmanager
+def pin_snapshot(repo_url: str, build_indexes: bool = False):
+    """
+    Like prefetch_repo, but yields the future and keeps the snapshot on disk
+    until the block exits, even if it is evicted or replaced meanwhile.
+    """
+    with _lock:
+        snapshot = _current_snapshot(repo_url, build_indexes)
+        snapshot.readers += 1
+    try:
+        yield snapshot.future
+    finally:
+        with _lock:
+            snapshot.close_reader()
+
+
+@contextmanager
+def open_snapshot(repo_url: str, timeout: float = None):
+    """
+    Yields the local path of a snapshot of the repo and keeps it on disk until
+    the block exits. The snapshot must not be modified.
+    """
+    with pin_snapshot(repo_url) as future:
+        yield future.result(timeout=timeout)
@@ -0,0 +1,191 @@
+# backend/app/github/tree_summary.py
+
+import heapq
+import math
+import os
+from collections import Counter
+
+from app.config import TREE_SUMMARY_MAX_FILES, TREE_SUMMARY_TOKEN_BUDGET
+from app.utils.tokens import estimate_tokens
+
+# Never descended into: VCS metadata, dependencies, caches and build output
+SKIP_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", "bower_components", "__pycache__", ".venv", "venv",
+    "env", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".idea", ".vscode",
+    "dist", "build", "out", "target", ".next", ".nuxt", ".gradle", "coverage", "site-packages",
+    "vendor", ".terraform", ".cache",
+}
+
+# Walked and counted, but only expanded if budget is left over
+LOW_INTEREST_DIRS = {
+    "test", "tests", "__tests__", "spec", "docs", "doc", "examples", "example", "fixtures",
+    "migrations", "assets", "static", "public", "images", "img", "locales", "i18n", "third_party",
+}
+
+SOURCE_EXTS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".kt", ".rb", ".php", ".cs",
+    ".c", ".cc", ".cpp", ".h", ".hpp", ".swift", ".scala", ".svelte", ".vue",
+}
+
+KEY_FILES = {
+    "readme.md", "readme.rst", "readme", "pyproject.toml", "setup.py", "package.json",
+    "cargo.toml", "go.mod", "pom.xml", "build.gradle", "dockerfile", "docker-compose.yml",
+    "main.py", "app.py", "manage.py", "__main__.py", "index.js", "index.ts", "index.tsx",
+    "main.go", "main.rs", "lib.rs", "server.js", "app.js", "app.tsx", "main.ts", "main.tsx",
+}
+
+# Representative files listed per expanded directory / child dirs listed before "... more"
+FILES_PER_DIR = 6
+CHILDREN_PER_DIR = 12
+
+
+class DirNode:
+    def __init__(self, rel: str, depth: int):
+        self.rel = rel
+        self.depth = depth
+        self.file_count = 0
+        self.own_files = 0  # files directly in this directory; file_count includes subdirectories
+        self.size = 0
+        self.exts = Counter()
+        self.files = []  # representative (rel_path, size), best first
+        self.children = []
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.rel) or "."
+
+    def interest(self) -> float:
+        source = sum(n for ext, n in self.exts.items() if ext in SOURCE_EXTS)
+        score = math.log1p(self.file_count) * (0.3 + source / max(self.file_count, 1))
+        if self.name.lower() in LOW_INTEREST_DIRS:
+            score *= 0.3
+        return score / (1 + 0.5 * self.depth)
+
+
+def _file_rank(name: str):
+    lower = name.lower()
+    ext = os.path.splitext(lower)[1]
+    return (lower not in KEY_FILES, ext not in SOURCE_EXTS, len(name), lower)
+
+
+def human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def build_tree(root: str, max_files: int = TREE_SUMMARY_MAX_FILES) -> DirNode:
+    """
+    Walks `root` once, skipping SKIP_DIRS, and aggregates file counts, sizes and
+    extensions per directory. Only a handful of representative file names are
+    kept per directory, so memory stays bounded on huge trees. Stops counting
+    after `max_files` files.
+    """
+    top = DirNode("", 0)
+    seen = 0
+
+    def walk(node: DirNode, path: str):
+        nonlocal seen
+        files, subdirs = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            subdirs.append(entry.name)
+                    elif entry.is_file(follow_symlinks=False) and seen < max_files:
+                        seen += 1
+                        try:
+                            size = entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            size = 0
+                        files.append((entry.name, size))
+        except OSError:
+            return
+
+        node.file_count = node.own_files = len(files)
+        node.size = sum(size for _, size in files)
+        node.exts = Counter(os.path.splitext(name)[1].lower() or name for name, _ in files)
+        node.files = [
+            (os.path.join(node.rel, name) if node.rel else name, size)
+            for name, size in heapq.nsmallest(FILES_PER_DIR, files, key=lambda f: _file_rank(f[0]))
+        ]
+
+        for name in sorted(subdirs):
+            if seen >= max_files:
+                break
+            child = DirNode(os.path.join(node.rel, name) if node.rel else name, node.depth + 1)
+            walk(child, os.path.join(path, name))
+            if child.file_count:
+                node.children.append(child)
+                node.file_count += child.file_count
+                node.size += child.size
+                node.exts.update(child.exts)
+
+    walk(top, root)
+    return top
+
+
+def _collapsed_line(node: DirNode, indent: str) -> str:
+    exts = " ".join(f"{ext}×{n}" for ext, n in node.exts.most_common(4))
+    return f"{indent}{node.rel or '.'}/  [{node.file_count} files, {human_size(node.size)}; {exts}]"
+
+
+def _expanded_lines(node: DirNode, indent: str) -> list:
+    lines = [f"{indent}  {rel}" for rel, _ in node.files]
+    hidden_files = node.own_files - len(node.files)
+    if hidden_files > 0:
+        lines.append(f"{indent}  ... {hidden_files} more files")
+    hidden = max(0, len(node.children) - CHILDREN_PER_DIR)
+    if hidden:
+        lines.append(f"{indent}  ... {hidden} more directories")
+    return lines
+
+
+def _visible_children(node: DirNode) -> list:
+    return sorted(node.children, key=lambda c: -c.interest())[:CHILDREN_PER_DIR]
+
+
+def summarize_tree(root: str, token_budget: int = TREE_SUMMARY_TOKEN_BUDGET, max_files: int = TREE_SUMMARY_MAX_FILES) -> str:
+    """
+    Renders a compact, budgeted overview of a repository: every directory
+    starts collapsed into one aggregate line, and the most interesting ones
+    (lots of source, shallow, not tests/docs/assets) are expanded into their
+    representative files and subdirectories until the token budget is spent.
+    """
+    top = build_tree(root, max_files)
+    if not top.file_count:
+        return ""
+
+    expanded = set()
+    used = estimate_tokens(_collapsed_line(top, ""))
+    candidates = [(-top.interest(), 0, top)]
+    order = 1
+    while candidates:
+        _, _, node = heapq.heappop(candidates)
+        children = _visible_children(node)
+        indent = "  " * node.depth
+        cost = sum(estimate_tokens(line) + 1 for line in _expanded_lines(node, indent))
+        cost += sum(estimate_tokens(_collapsed_line(child, indent + "  ")) + 1 for child in children)
+        if used + cost > token_budget:
+            continue
+        used += cost
+        expanded.add(node.rel)
+        for child in children:
+            heapq.heappush(candidates, (-child.interest(), order, child))
+            order += 1
+
+    lines = []
+
+    def render(node: DirNode):
+        indent = "  " * node.depth
+        lines.append(_collapsed_line(node, indent))
+        if node.rel not in expanded:
+            return
+        lines.extend(_expanded_lines(node, indent))
+        for child in _visible_children(node):
+            render(child)
+
+    render(top)
+    return "\n".join(lines)
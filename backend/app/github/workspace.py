@@ -0,0 +1,302 @@
+# backend/app/github/workspace.py
+
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.config import (
+    WORKSPACE_ROOT,
+    WORKSPACE_QUOTA_BYTES,
+    WORKSPACE_RESERVATION_BYTES,
+    WORKSPACE_GLOBAL_QUOTA_BYTES,
+    WORKSPACE_TTL_SECONDS,
+    WORKSPACE_SWEEP_INTERVAL,
+)
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+def disk_usage(path: str, count_shared: bool = True) -> int:
+    """
+    Total size in bytes of the files under `path` (symlinks not followed).
+    With count_shared=False, files hardlinked from elsewhere are not counted.
+    """
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                            if count_shared or st.st_nlink <= 1:
+                                total += st.st_size
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Workspace:
+    """
+    A leased directory with its own byte quota and an expiry time. Against the
+    global budget it is charged its last measured usage, or its up-front
+    reservation while that is larger.
+    """
+
+    def __init__(
+        self, manager, name: str, path: str, quota_bytes: int, ttl: float,
+        shared_base: bool = False, reserved_bytes: int = 0,
+    ):
+        self.manager = manager
+        self.name = name
+        self.id = os.path.basename(path)
+        self.path = path
+        self.quota_bytes = quota_bytes
+        # copy-on-write overlays only pay for the files they have un-shared
+        self.shared_base = shared_base
+        self.reserved_bytes = min(reserved_bytes, quota_bytes)
+        self.measured_bytes = 0
+        self.created = time.time()
+        self.expires_at = self.created + ttl
+
+    def usage(self) -> int:
+        self.measured_bytes = disk_usage(self.path, count_shared=not self.shared_base)
+        return self.measured_bytes
+
+    def charged(self) -> int:
+        return max(self.measured_bytes, self.reserved_bytes)
+
+    def check_quota(self, pending: int = 0):
+        """Raises QuotaExceeded if the workspace (plus `pending` bytes about to be written) is over quota."""
+        used = self.usage() + pending
+        if used > self.quota_bytes:
+            raise QuotaExceeded(f"Workspace {self.id} uses {used} bytes, quota is {self.quota_bytes}")
+
+    def renew(self, ttl: float = None):
+        self.expires_at = time.time() + (ttl or WORKSPACE_TTL_SECONDS)
+        self.manager.write_lease(self)
+
+    def expired(self) -> bool:
+        return time.time() > self.expires_at
+
+    def release(self):
+        self.manager.release(self)
+
+
+class WorkspaceManager:
+    """
+    Hands out leased directories under one root. Each lease is charged against
+    a global byte budget by its measured usage (refreshed on quota checks and
+    by the sweeper), with a small reservation until it has grown past that.
+    Leases are deleted on release and reclaimed by a background sweeper once
+    they expire. The root may be shared by several processes (uvicorn
+    workers, the batch CLI), so every lease also gets a "<id>.lease" file
+    next to its directory naming the owning pid and expiry; the sweeper only
+    reclaims directories it doesn't own once that owner has died or the
+    lease has expired.
+    """
+
+    def __init__(
+        self,
+        root: str = WORKSPACE_ROOT,
+        global_quota_bytes: int = WORKSPACE_GLOBAL_QUOTA_BYTES,
+        default_quota_bytes: int = WORKSPACE_QUOTA_BYTES,
+        default_ttl: float = WORKSPACE_TTL_SECONDS,
+        default_reservation_bytes: int = WORKSPACE_RESERVATION_BYTES,
+    ):
+        self.root = root
+        self.global_quota_bytes = global_quota_bytes
+        self.default_quota_bytes = default_quota_bytes
+        self.default_ttl = default_ttl
+        self.default_reservation_bytes = default_reservation_bytes
+        self._active = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+        self._stats = {"leased": 0, "released": 0, "expired": 0, "orphans_removed": 0, "rejected": 0}
+        os.makedirs(root, exist_ok=True)
+
+    def _charged(self) -> int:
+        return sum(ws.charged() for ws in self._active.values())
+
+    def acquire(
+        self, name: str = "ws", ttl: float = None, quota_bytes: int = None,
+        shared_base: bool = False, reserved_bytes: int = None,
+    ) -> Workspace:
+        quota_bytes = quota_bytes or self.default_quota_bytes
+        reserved_bytes = min(quota_bytes, reserved_bytes or self.default_reservation_bytes)
+        with self._lock:
+            if self._charged() + reserved_bytes > self.global_quota_bytes:
+                self._sweep_expired_locked()
+            if self._charged() + reserved_bytes > self.global_quota_bytes:
+                self._stats["rejected"] += 1
+                raise QuotaExceeded(
+                    f"Global workspace quota of {self.global_quota_bytes} bytes exhausted "
+                    f"({self._charged()} charged to {len(self._active)} workspaces)"
+                )
+            path = os.path.join(self.root, f"{name}-{uuid.uuid4().hex[:12]}")
+            os.makedirs(path)
+            workspace = Workspace(self, name, path, quota_bytes, ttl or self.default_ttl, shared_base, reserved_bytes)
+            self.write_lease(workspace)
+            self._active[workspace.id] = workspace
+            self._stats["leased"] += 1
+            return workspace
+
+    def _lease_path(self, workspace_id: str) -> str:
+        return os.path.join(self.root, f"{workspace_id}.lease")
+
+    def write_lease(self, workspace: Workspace):
+        """Records the owning process and expiry of a lease for sweepers in other processes."""
+        path = self._lease_path(workspace.id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"pid": os.getpid(), "expires_at": workspace.expires_at}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write lease file for {workspace.id}: {e}")
+
+    def _remove(self, workspace_id: str, path: str):
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.unlink(self._lease_path(workspace_id))
+        except FileNotFoundError:
+            pass
+
+    def _reclaimable(self, workspace_id: str, mtime: float) -> bool:
+        """Whether a directory no lease of this process owns can be deleted."""
+        try:
+            with open(self._lease_path(workspace_id)) as f:
+                lease = json.load(f)
+        except (OSError, ValueError):
+            # no lease file yet (or left by an older version), or an unreadable one:
+            # only reclaim once nothing has touched it for a whole TTL
+            return mtime < time.time() - self.default_ttl
+        return not _pid_alive(lease["pid"]) or time.time() > lease["expires_at"]
+
+    @contextmanager
+    def lease(self, name: str = "ws", ttl: float = None, quota_bytes: int = None, reserved_bytes: int = None):
+        workspace = self.acquire(name, ttl, quota_bytes, reserved_bytes=reserved_bytes)
+        try:
+            yield workspace
+        finally:
+            self.release(workspace)
+
+    def release(self, workspace: Workspace):
+        with self._lock:
+            if self._active.pop(workspace.id, None) is None:
+                return
+            self._stats["released"] += 1
+        self._remove(workspace.id, workspace.path)
+
+    def _sweep_expired_locked(self) -> list:
+        expired = [ws for ws in self._active.values() if ws.expired()]
+        for ws in expired:
+            del self._active[ws.id]
+            self._remove(ws.id, ws.path)
+        self._stats["expired"] += len(expired)
+        return expired
+
+    def sweep(self):
+        """Reclaims expired leases and directories no live lease owns, and re-measures live leases."""
+        with self._lock:
+            self._sweep_expired_locked()
+            owned = set(self._active)
+            active = list(self._active.values())
+        for ws in active:
+            ws.usage()
+        try:
+            names = set(os.listdir(self.root))
+        except OSError as e:
+            print(f"Workspace sweep failed: {e}")
+            return
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            workspace_id = name[: -len(".lease")] if name.endswith(".lease") else name
+            # a lease file is handled together with its directory, unless that is already gone
+            if workspace_id in owned or (workspace_id != name and workspace_id in names):
+                continue
+            path = os.path.join(self.root, workspace_id)
+            try:
+                st = os.stat(os.path.join(self.root, name), follow_symlinks=False)
+            except OSError:
+                continue
+            if workspace_id == name and not stat.S_ISDIR(st.st_mode):
+                continue
+            if self._reclaimable(workspace_id, st.st_mtime):
+                self._remove(workspace_id, path)
+                if workspace_id == name:
+                    with self._lock:
+                        self._stats["orphans_removed"] += 1
+
+    def start_sweeper(self, interval: float = WORKSPACE_SWEEP_INTERVAL):
+        if self._sweeper is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.sweep()
+
+        self._sweeper = threading.Thread(target=run, name="workspace-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = list(self._active.values())
+            stats = dict(self._stats)
+        usage = {ws.id: ws.usage() for ws in active}
+        stats.update({
+            "active": len(active),
+            "charged_bytes": sum(ws.charged() for ws in active),
+            "used_bytes": sum(usage.values()),
+            "global_quota_bytes": self.global_quota_bytes,
+            "workspaces": [
+                {
+                    "id": ws.id,
+                    "used_bytes": usage[ws.id],
+                    "quota_bytes": ws.quota_bytes,
+                    "expires_in": round(ws.expires_at - time.time(), 1),
+                }
+                for ws in active
+            ],
+        })
+        return stats
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = WorkspaceManager()
+            _manager.start_sweeper()
+        return _manager
@@ -0,0 +1,185 @@
+# backend/app/github/worktree.py
+
+import difflib
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from app.config import WORKTREE_QUOTA_BYTES, WORKTREE_RESERVATION_BYTES
+from app.github.manifest import invalidate_manifests
+from app.github.workspace import get_workspace_manager
+
+# os.umask can only be read by setting it, which isn't thread-safe later on
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def replace_file(path: str, content: str):
+    """
+    Writes `content` to a temporary file next to `path` and renames it over
+    `path`. The old inode is never truncated, so cached mmaps of the file
+    (see app/utils/line_index.py) and hardlinked base snapshots keep their
+    contents, and readers never see a half-written file.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".write-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        try:
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            # a new file: mkstemp made it 0600, give it what open() would have
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    invalidate_manifests(path)
+
+
+def must_copy(rel_dir: str) -> bool:
+    """
+    Whether files in `rel_dir` must be copied rather than hardlinked. Git
+    rewrites or appends to most of its metadata in place (reflogs under
+    .git/logs, COMMIT_EDITMSG, ORIG_HEAD, ...), which would write through a
+    hardlink into the base. Only the object store is safe to share: objects
+    are immutable and always written as new files.
+    """
+    parts = rel_dir.split(os.sep)
+    return parts[0] == ".git" and (len(parts) < 2 or parts[1] != "objects")
+
+
+def link_tree(base: str, target: str) -> int:
+    """
+    Mirrors `base` into `target` as a hardlink farm: directories are created,
+    files are hardlinked (copied if linking fails, e.g. across devices, or if
+    must_copy says so) and symlinks are recreated. Returns the number of files
+    linked.
+    """
+    linked = 0
+    for root, dirs, files in os.walk(base):
+        rel = os.path.relpath(root, base)
+        copy = rel != "." and must_copy(rel)
+        dest_root = target if rel == "." else os.path.join(target, rel)
+        os.makedirs(dest_root, exist_ok=True)
+        for name in dirs:
+            src = os.path.join(root, name)
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), os.path.join(dest_root, name))
+        for name in files:
+            src = os.path.join(root, name)
+            dest = os.path.join(dest_root, name)
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dest)
+                continue
+            if copy:
+                shutil.copy2(src, dest)
+                continue
+            try:
+                os.link(src, dest)
+                linked += 1
+            except OSError:
+                shutil.copy2(src, dest)
+    return linked
+
+
+class SessionWorktree:
+    """
+    A writable, private view of a read-only base snapshot. Files start out as
+    hardlinks into the base, so creating one costs a directory walk and no
+    file data; writers replace files instead of writing in place (see
+    replace_file), so changes only ever touch the session's own copy. Git metadata is copied, apart from the
+    immutable object store, so commits made in the session stay private too.
+    """
+
+    def __init__(self, session_id: str, base: str):
+        self.session_id = session_id
+        self.base = os.path.abspath(base)
+        # an overlay only pays for the files it un-shares, so it needs little of the global budget
+        self.workspace = get_workspace_manager().acquire(
+            "session", quota_bytes=WORKTREE_QUOTA_BYTES, shared_base=True, reserved_bytes=WORKTREE_RESERVATION_BYTES,
+        )
+        self.path = os.path.join(self.workspace.path, "tree")
+        started = time.monotonic()
+        count = link_tree(self.base, self.path)
+        print(f"Session worktree for {session_id}: {count} files linked in {time.monotonic() - started:.3f}s")
+
+    def resolve(self, path: str) -> str:
+        """
+        Maps a path in the base snapshot (or relative to the repo) into this
+        worktree. Raises ValueError for anything that would land outside it,
+        such as other absolute paths, '..' escapes or symlinks out of the tree.
+        """
+        path = os.path.normpath(path)
+        if os.path.isabs(path) and (path == self.base or path.startswith(self.base + os.sep)):
+            path = os.path.relpath(path, self.base)
+        root = os.path.realpath(self.path)
+        target = os.path.realpath(os.path.join(root, path))
+        if target != root and not target.startswith(root + os.sep):
+            raise ValueError(f"{path} is outside the session worktree")
+        return target
+
+    def diff(self, path: str) -> str:
+        """Unified diff of a file in this worktree against the base snapshot."""
+        target = self.resolve(path)
+        rel = os.path.relpath(target, os.path.realpath(self.path))
+        base_file = os.path.join(self.base, rel)
+
+        def read(p):
+            if not os.path.exists(p):
+                return []
+            with open(p, "r", encoding="utf-8", errors="ignore") as f:
+                return f.read().splitlines(keepends=True)
+
+        diff = difflib.unified_diff(read(base_file), read(target), fromfile=f"a/{rel}", tofile=f"b/{rel}")
+        return "".join(diff) or "No differences with the base snapshot."
+
+    def usable(self) -> bool:
+        return os.path.isdir(self.path) and os.path.isdir(self.base) and not self.workspace.expired()
+
+    def close(self):
+        self.workspace.release()
+
+
+_worktrees = {}
+_lock = threading.Lock()
+
+
+def _close_where(predicate):
+    with _lock:
+        closing = [key for key, worktree in _worktrees.items() if predicate(key, worktree)]
+        closed = [_worktrees.pop(key) for key in closing]
+    for worktree in closed:
+        worktree.close()
+
+
+def get_session_worktree(session_id: str, base: str) -> SessionWorktree:
+    """
+    Returns the session's worktree over `base`, creating it on first use.
+    Worktrees whose lease expired or whose base snapshot is gone are dropped
+    along the way.
+    """
+    _close_where(lambda key, worktree: not worktree.usable())
+    key = (session_id, os.path.abspath(base))
+    with _lock:
+        worktree = _worktrees.get(key)
+        if worktree is not None:
+            worktree.workspace.renew()
+            return worktree
+        worktree = SessionWorktree(session_id, base)
+        _worktrees[key] = worktree
+        return worktree
+
+
+def close_session_worktrees(session_id: str):
+    """Drops every worktree of a session, e.g. at the end of a one-off request."""
+    _close_where(lambda key, worktree: key[0] == session_id)
+
+
+def close_worktrees_under(path: str):
+    """Drops the worktrees over a base snapshot that is being deleted."""
+    path = os.path.abspath(path)
+    _close_where(lambda key, worktree: key[1] == path or key[1].startswith(path + os.sep))
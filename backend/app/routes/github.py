@@ -1,9 +1,12 @@
 from typing import Optional
 import uuid
 from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from app.analysis.diff_review import review_diff
 from app.github.client import parse_github_url, get_branches, get_repo_contents, get_repo_metadata
 from app.github.clone import clone_private_repo, download_public_repo
 from app.github.patch import apply_patch_to_repo
+from app.github.workspace import get_workspace_manager
 from app.github.commit_push import commit_patch_and_create_pr
 
 router = APIRouter()
@@ -32,24 +35,53 @@ def get_repo_files(repo_url: str, path: str = ""):
 
 @router.post("/github/pr")
 def handle_patch_and_pr(repo_url: str, patch: str, token: Optional[str] = None):
-    if token:
-        path = clone_private_repo(repo_url, token)
-    else:
-        path = download_public_repo(repo_url)
+    with get_workspace_manager().lease("pr") as workspace:
+        if token:
+            path = clone_private_repo(repo_url, token, workspace)
+        else:
+            path = download_public_repo(repo_url, workspace)
 
-    apply_patch_to_repo(path, patch)
+        apply_patch_to_repo(path, patch)
 
-    if not token:
-        return {"status": "Patch applied locally (public mode)"}
+        if not token:
+            return {"status": "Patch applied locally (public mode)"}
 
-    pr_url = commit_patch_and_create_pr(
-        token=token,
-        repo_url=repo_url,
-        patch_branch="auto-patch-" + str(uuid.uuid4())[:8],
-        commit_msg="fix: automated patch",
-        pr_title="Suggested Fix from AI",
-        pr_body="This PR was generated from an automated analysis of the repo."
-    )
+        pr_url = commit_patch_and_create_pr(
+            token=token,
+            repo_url=repo_url,
+            patch_branch="auto-patch-" + str(uuid.uuid4())[:8],
+            commit_msg="fix: automated patch",
+            pr_title="Suggested Fix from AI",
+            pr_body="This PR was generated from an automated analysis of the repo."
+        )
 
     return {"status": "PR created", "url": pr_url}
 
+@router.get("/github/workspaces")
+def workspace_stats():
+    return get_workspace_manager().stats()
+
+
+class DiffReviewRequest(BaseModel):
+    repo_url: str
+    base: Optional[str] = None
+    head: Optional[str] = None
+    pr_number: Optional[int] = None
+    token: Optional[str] = None
+    suggest: bool = False
+    max_patches: int = 5
+
+@router.post("/github/review")
+def review_changes(request: DiffReviewRequest):
+    try:
+        return review_diff(
+            repo_url=request.repo_url,
+            base=request.base,
+            head=request.head,
+            pr_number=request.pr_number,
+            token=request.token,
+            suggest=request.suggest,
+            max_patches=request.max_patches,
+        )
+    except Exception as e:
+        return {"error": str(e)}
@@ -0,0 +1,129 @@
+# backend/app/utils/line_index.py
+
+import ast
+import mmap
+import os
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+# Number of open file indexes kept around between tool calls
+MAX_CACHED_INDEXES = 32
+
+NEWLINE = re.compile(b"\n")
+
+
+class LineIndex:
+    """
+    Memory-mapped view of a file with a lazily built line-offset table.
+    Offsets are only scanned as far as the furthest line requested so far, and
+    once known any window of lines is a single slice of the mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.version = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        self._mm = None
+        if self.size:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._newlines = NEWLINE.finditer(self._mm)
+        # _offsets[i] is the byte offset where line i + 1 starts
+        self._offsets = array("q", [0])
+        self._complete = self.size == 0
+        self._symbols = None
+        self._lock = threading.Lock()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+
+    def _scan_to(self, line):
+        """Extends the offset table until it covers `line` or reaches EOF."""
+        if self._complete or len(self._offsets) > line:
+            return
+        wanted = None if line == float("inf") else line - len(self._offsets) + 1
+        before = len(self._offsets)
+        self._offsets.extend(m.end() for m in islice(self._newlines, wanted))
+        if wanted is None or len(self._offsets) - before < wanted:
+            self._complete = True
+
+    def line_count(self) -> int:
+        with self._lock:
+            self._scan_to(float("inf"))
+            if self.size == 0:
+                return 0
+            # a trailing newline doesn't start another line
+            return len(self._offsets) - 1 if self._offsets[-1] == self.size else len(self._offsets)
+
+    def total_if_known(self):
+        return self.line_count() if self._complete else None
+
+    def read_lines(self, start: int, end: int) -> str:
+        """Returns lines start..end (1-based, inclusive)."""
+        if self._mm is None or end < start:
+            return ""
+        with self._lock:
+            self._scan_to(end)
+            begin = self._offsets[start - 1] if start - 1 < len(self._offsets) else self.size
+            stop = self._offsets[end] if end < len(self._offsets) else self.size
+            return self._mm[begin:stop].decode("utf-8", errors="ignore")
+
+    def symbols(self) -> dict:
+        """Maps qualified names (e.g. 'Class.method') of Python defs to (start, end) lines."""
+        if self._symbols is None:
+            source = self._mm[:].decode("utf-8", errors="ignore") if self._mm is not None else ""
+            self._symbols = _collect_symbols(source)
+        return self._symbols
+
+    def find_symbol(self, name: str):
+        symbols = self.symbols()
+        if name in symbols:
+            return symbols[name]
+        matches = [span for qualname, span in symbols.items() if qualname.rsplit(".", 1)[-1] == name]
+        return matches[0] if len(matches) == 1 else None
+
+
+def _collect_symbols(source: str) -> dict:
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return {}
+
+    symbols = {}
+
+    def visit(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{prefix}{child.name}"
+                start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                symbols[qualname] = (start, child.end_lineno)
+                visit(child, qualname + ".")
+
+    visit(tree, "")
+    return symbols
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_line_index(path: str) -> LineIndex:
+    """Returns a cached LineIndex for `path`, rebuilding it if the file changed."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    with _cache_lock:
+        index = _cache.get(path)
+        if index is not None and index.version == (stat.st_mtime_ns, stat.st_size):
+            _cache.move_to_end(path)
+            return index
+        # replaced/evicted indexes are closed when the last reader drops them
+        index = LineIndex(path)
+        _cache[path] = index
+        while len(_cache) > MAX_CACHED_INDEXES:
+            _cache.popitem(last=False)
+        return index
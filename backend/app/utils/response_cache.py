@@ -0,0 +1,163 @@
+# backend/app/utils/response_cache.py
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from app.config import RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_MAX_ENTRIES
+from app.github.parser import tree_fingerprint
+
+try:
+    import zstandard
+except ImportError:  # optional: responses are then only precompressed with gzip
+    zstandard = None
+
+
+class CachedBody:
+    """
+    A serialized JSON response kept only in compressed form. Each content
+    coding gets its own strong ETag, derived from the uncompressed bytes.
+    """
+
+    def __init__(self, body: bytes):
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.encoded = {"gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+        if zstandard is not None:
+            self.encoded["zstd"] = zstandard.ZstdCompressor(level=3).compress(body)
+        self.size = sum(len(b) for b in self.encoded.values())
+
+    def etag(self, encoding: str = None) -> str:
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def etags(self) -> set:
+        return {self.etag()} | {self.etag(e) for e in self.encoded}
+
+    def body(self, encoding: str = None) -> bytes:
+        return self.encoded[encoding] if encoding else gzip.decompress(self.encoded["gzip"])
+
+
+def negotiate_encoding(accept_encoding: str, available) -> str:
+    """Picks zstd, then gzip, from an Accept-Encoding header; None means identity."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in ("zstd", "gzip"):
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if coding in available and q > 0:
+            return coding
+    return None
+
+
+def etag_matches(if_none_match: str, etags: set) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") in etags for tag in if_none_match.split(","))
+
+
+class ResponseCache:
+    """
+    LRU of compressed JSON responses keyed by endpoint, query and the tree
+    fingerprint of the directory the endpoint analyzes, so entries go stale
+    by themselves when a Python file changes. Concurrent misses on the same
+    key wait for one computation instead of repeating it.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key, entry: CachedBody):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get_or_compute(self, key, compute) -> CachedBody:
+        entry = self._lookup(key)
+        if entry is not None:
+            self._count("hits")
+            return entry
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self._count("hits")
+                    return entry
+                self._count("misses")
+                body = json.dumps(compute(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                entry = CachedBody(body)
+                self._store(key, entry)
+                return entry
+        finally:
+            with self._lock:
+                self._key_locks.pop(key, None)
+
+    def respond(self, request: Request, endpoint: str, directory: str, compute, version: str = None) -> Response:
+        """
+        Serves `compute()` as JSON for this request: 304 if the client's
+        If-None-Match still matches, otherwise the cached body in the best
+        encoding the client accepts. `version` is for endpoints that depend on
+        more than the Python files under `directory` (e.g. the git HEAD).
+        """
+        key = (endpoint, tuple(sorted(request.query_params.multi_items())), directory, tree_fingerprint(directory), version)
+        entry = self.get_or_compute(key, compute)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), entry.encoded)
+        headers = {"ETag": entry.etag(encoding), "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etags()):
+            self._count("not_modified")
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(entry.body(encoding), media_type="application/json", headers=headers)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -0,0 +1,8 @@
+# backend/app/utils/tokens.py
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English and code).
+    Good enough for budgeting prompts without pulling in a tokenizer.
+    """
+    return (len(text) + 3) // 4
@@ -0,0 +1,145 @@
+# backend/loadtest/fakes.py
+#
+# Local stand-ins for GitHub (REST API + archive downloads) and the LLM
+# endpoint, so the load harness measures this backend rather than the network.
+
+import asyncio
+import io
+import re
+import zipfile
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+SAMPLE_OWNER = "loadtest"
+SAMPLE_REPO = "sample"
+SAMPLE_REPO_URL = f"https://github.com/{SAMPLE_OWNER}/{SAMPLE_REPO}"
+SAMPLE_HEAD_SHA = "0" * 40
+
+
+def sample_files(modules: int = 20) -> dict:
+    """A small Python package with imports between modules and a few lint issues."""
+    files = {
+        "README.md": "# sample\n\nA generated repository for load testing.\n",
+        "main.py": "from pkg import mod0\n\n\ndef main():\n    return mod0.run(1)\n",
+        "pkg/__init__.py": "",
+    }
+    for i in range(modules):
+        imports = f"from pkg import mod{i - 1}\n" if i else ""
+        call = f"mod{i - 1}.run(value) + " if i else ""
+        files[f"pkg/mod{i}.py"] = (
+            f"import os\n{imports}\n\n"
+            f"def run(value):\n"
+            f"    total = {call}value\n"
+            f"    for step in range(10):\n"
+            f"        if step % 2 == 0 and value > step:\n"
+            f"            total += step\n"
+            f"    return total\n\n\n"
+            f"class Worker{i}:\n"
+            f"    def handle(self, item):\n"
+            f"        unused = os.getcwd()\n"
+            f"        return run(item)\n"
+        )
+    return files
+
+
+# every fake PR touches the top of run() in each changed module
+SAMPLE_PATCH = "@@ -4,3 +4,4 @@\n def run(value):\n-    total = value\n+    total = value\n+    total += 0\n"
+
+
+def build_archive(files: dict, repo: str, branch: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path, content in files.items():
+            archive.writestr(f"{repo}-{branch}/{path}", content)
+    return buffer.getvalue()
+
+
+def agent_reply(prompt: str) -> str:
+    """
+    Plays the ReAct agent: the first step calls load_and_analyze_repo for the
+    repo in the question, the step after an observation answers. Anything
+    else (tool-internal calls, memory summaries) gets plain text.
+    """
+    if "Action Input" not in prompt:
+        return "main.py\npkg/mod0.py" if "File tree" in prompt else "A small sample package."
+    # only the question and scratchpad at the end matter, the rest is format instructions
+    question = prompt.rsplit("Question:", 1)[-1]
+    if "Observation:" in question:
+        return "Thought: I now know the final answer\nFinal Answer: It is a small sample package."
+    match = re.search(r"Repo_URL:\s*(\S+)", question)
+    repo_url = match.group(1) if match else SAMPLE_REPO_URL
+    return (
+        "Thought: I should look at the repository.\n"
+        "Action: load_and_analyze_repo\n"
+        f"Action Input: Query: What does this repo do?\nRepo_URL:{repo_url}"
+    )
+
+
+def create_fake_upstream(github_latency: float = 0.05, llm_latency: float = 0.5, modules: int = 20) -> FastAPI:
+    """
+    One app serving both fakes: GitHub's REST API under /api, archive
+    downloads at /<owner>/<repo>/archive/..., and the LLM at /llm/chat/completions.
+    Latencies are injected with asyncio.sleep so the fakes themselves never saturate.
+    """
+    app = FastAPI()
+    files = sample_files(modules)
+    archives = {}
+    calls = {"github": 0, "archive": 0, "llm": 0}
+    app.state.calls = calls
+
+    @app.post("/llm/chat/completions")
+    async def chat_completions(request: Request):
+        calls["llm"] += 1
+        payload = await request.json()
+        await asyncio.sleep(llm_latency)
+        prompt = "\n".join(m.get("content", "") for m in payload.get("messages", []))
+        return {"choices": [{"message": {"role": "assistant", "content": agent_reply(prompt)}}]}
+
+    @app.get("/{owner}/{repo}/archive/refs/heads/{branch}.zip")
+    async def archive(owner: str, repo: str, branch: str):
+        calls["archive"] += 1
+        await asyncio.sleep(github_latency)
+        key = (repo, branch)
+        if key not in archives:
+            archives[key] = build_archive(files, repo, branch)
+        return Response(archives[key], media_type="application/zip")
+
+    @app.get("/api/repos/{owner}/{repo}")
+    async def metadata(owner: str, repo: str):
+        calls["github"] += 1
+        await asyncio.sleep(github_latency)
+        return {"name": repo, "default_branch": "main", "description": "Load test fixture", "private": False}
+
+    @app.get("/api/repos/{owner}/{repo}/branches")
+    async def branches(owner: str, repo: str):
+        calls["github"] += 1
+        await asyncio.sleep(github_latency)
+        return [{"name": "main", "commit": {"sha": SAMPLE_HEAD_SHA}}]
+
+    @app.get("/api/repos/{owner}/{repo}/pulls/{number}")
+    async def pull_request(owner: str, repo: str, number: int):
+        calls["github"] += 1
+        await asyncio.sleep(github_latency)
+        return {"number": number, "head": {"sha": SAMPLE_HEAD_SHA}}
+
+    @app.get("/api/repos/{owner}/{repo}/pulls/{number}/files")
+    async def pull_request_files(owner: str, repo: str, number: int, page: int = 1):
+        calls["github"] += 1
+        await asyncio.sleep(github_latency)
+        if page > 1:
+            return []
+        changed = [path for path in files if path.startswith("pkg/mod")][:5]
+        return [{"filename": path, "status": "modified", "patch": SAMPLE_PATCH} for path in changed]
+
+    @app.get("/api/repos/{owner}/{repo}/contents/{path:path}")
+    async def contents(owner: str, repo: str, path: str, request: Request):
+        calls["github"] += 1
+        await asyncio.sleep(github_latency)
+        if path not in files:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        if "raw" in request.headers.get("accept", ""):
+            return Response(files[path], media_type="text/plain")
+        return {"name": path.rsplit("/", 1)[-1], "path": path, "sha": SAMPLE_HEAD_SHA, "type": "file"}
+
+    return app
@@ -0,0 +1,349 @@
+# backend/loadtest/run.py
+#
+# Load harness for the backend. Runs the FastAPI app in-process (ASGI) or under
+# uvicorn against local fake GitHub/LLM services, ramps concurrency per
+# endpoint and reports throughput, p50/p95/p99 latency and event-loop stalls.
+#
+# From backend/:
+#   python -m loadtest.run
+#   python -m loadtest.run --mode uvicorn --stages 1,8,32 --duration 20
+#   python -m loadtest.run --save-baseline loadtest/baseline.json
+#   python -m loadtest.run --compare loadtest/baseline.json
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from loadtest.fakes import SAMPLE_REPO_URL, create_fake_upstream
+
+# a fresh value per request keeps /suggestions out of the response cache
+_cache_buster = itertools.count()
+
+# endpoint name -> (method, path, request kwargs)
+SCENARIOS = {
+    "query-repo": ("POST", "/query-repo", lambda worker: {"json": {
+        "repo_url": SAMPLE_REPO_URL,
+        "query": "What does this repo do?",
+        "session_id": f"loadtest-{worker}",
+    }}),
+    # after the first request this is served from the response cache (app/utils/response_cache.py)
+    "suggestions": ("GET", "/suggestions", lambda worker: {"params": {"limit": 20}}),
+    # the same page computed from scratch every time: linting, not cache hits
+    "suggestions-cold": ("GET", "/suggestions", lambda worker: {"params": {"limit": 5, "nocache": next(_cache_buster)}}),
+    "github-info": ("GET", "/github/info", lambda worker: {"params": {"repo_url": SAMPLE_REPO_URL}}),
+    "github-review": ("POST", "/github/review", lambda worker: {"json": {"repo_url": SAMPLE_REPO_URL, "pr_number": 1}}),
+    "github-workspaces": ("GET", "/github/workspaces", lambda worker: {}),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class LoopMonitor:
+    """
+    Runs inside the app's event loop and measures how late a short periodic
+    sleep wakes up. Any sync work done on the loop (rather than in the
+    threadpool) shows up as lag. Also samples how many of the default
+    threadpool's tokens are in use, since sync handlers queue there.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags = []
+        self.threads_in_use = []
+        self.thread_limit = None
+        self._task = None
+
+    async def _run(self):
+        import anyio.to_thread
+        loop = asyncio.get_running_loop()
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        self.thread_limit = limiter.total_tokens
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - started - self.interval, 0.0))
+            self.threads_in_use.append(limiter.borrowed_tokens)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def mark(self) -> tuple:
+        return len(self.lags), len(self.threads_in_use)
+
+    def since(self, mark: tuple, stall_seconds: float) -> dict:
+        lags = self.lags[mark[0]:]
+        threads = self.threads_in_use[mark[1]:]
+        return {
+            "loop_lag_p99_ms": round(percentile(lags, 99) * 1000, 1),
+            "loop_lag_max_ms": round(max(lags, default=0.0) * 1000, 1),
+            "loop_stalls": sum(1 for lag in lags if lag >= stall_seconds),
+            "threadpool_peak": max(threads, default=0),
+            "threadpool_limit": self.thread_limit,
+        }
+
+
+def serve_in_thread(app, port: int, monitor: LoopMonitor = None) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+
+    async def serve():
+        if monitor is not None:
+            monitor.start()
+        await server.serve()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def configure_environment(upstream: str, scratch: str):
+    """Points the backend at the fakes. Must run before the app is imported."""
+    os.environ["GITHUB_API_URL"] = f"{upstream}/api"
+    os.environ["GITHUB_WEB_URL"] = upstream
+    os.environ["LLM_API_URL"] = f"{upstream}/llm/chat/completions"
+    os.environ.setdefault("GITHUB_API_TOKEN", "loadtest-token")
+    # the real upstream rate limits would dominate every measurement
+    os.environ.setdefault("LLM_REQUESTS_PER_SECOND", "1000")
+    os.environ.setdefault("LLM_BURST", "1000")
+    os.environ.setdefault("WORKSPACE_ROOT", os.path.join(scratch, "workspaces"))
+    os.environ.setdefault("MEMORY_DB_PATH", os.path.join(scratch, "memory.sqlite3"))
+
+
+async def run_stage(client: httpx.AsyncClient, endpoint: str, concurrency: int, duration: float) -> dict:
+    """Closed loop: `concurrency` workers send requests back to back for `duration` seconds."""
+    method, path, make_kwargs = SCENARIOS[endpoint]
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **make_kwargs(worker_id))
+                ok = response.status_code < 400
+                if ok and response.headers.get("content-type", "").startswith("application/json"):
+                    body = response.json()
+                    ok = not (isinstance(body, dict) and "error" in body)
+                if not ok:
+                    errors.append(f"HTTP {response.status_code}: {response.text[:200]}")
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "sample_error": errors[0] if errors else None,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(max(latencies, default=0.0) * 1000, 1),
+    }
+
+
+def sustained_concurrency(stages: list, degrade_factor: float, max_error_rate: float) -> int:
+    """Highest stage whose p95 stays within degrade_factor of the first stage and whose errors stay low."""
+    if not stages:
+        return 0
+    reference = stages[0]["p95_ms"] or 1.0
+    sustained = 0
+    for stage in stages:
+        error_rate = stage["errors"] / max(stage["requests"], 1)
+        if error_rate > max_error_rate or stage["p95_ms"] > reference * degrade_factor:
+            break
+        sustained = stage["concurrency"]
+    return sustained
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float) -> list:
+    """Returns one line per endpoint/stage present in both runs, flagging regressions."""
+    lines = []
+    for endpoint, current in results.items():
+        previous = {str(s["concurrency"]): s for s in baseline.get("results", {}).get(endpoint, {}).get("stages", [])}
+        for stage in current["stages"]:
+            before = previous.get(str(stage["concurrency"]))
+            if before is None:
+                continue
+            rps_change = (stage["throughput_rps"] - before["throughput_rps"]) / max(before["throughput_rps"], 1e-9)
+            p95_change = (stage["p95_ms"] - before["p95_ms"]) / max(before["p95_ms"], 1e-9)
+            flag = "REGRESSION" if p95_change > threshold or rps_change < -threshold else "ok"
+            lines.append(
+                f"{endpoint:<18} c={stage['concurrency']:<4} rps {before['throughput_rps']:>8} -> {stage['throughput_rps']:<8} "
+                f"({rps_change:+.0%})  p95 {before['p95_ms']:>8} -> {stage['p95_ms']:<8} ({p95_change:+.0%})  {flag}"
+            )
+    return lines
+
+
+def print_report(results: dict, out):
+    header = f"{'endpoint':<18} {'conc':>4} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'lag p99':>8} {'stalls':>6} {'threads':>8}"
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for endpoint, result in results.items():
+        for s in result["stages"]:
+            print(
+                f"{endpoint:<18} {s['concurrency']:>4} {s['requests']:>6} {s['errors']:>4} {s['throughput_rps']:>8} "
+                f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8} {s.get('loop_lag_p99_ms', '-'):>8} "
+                f"{s.get('loop_stalls', '-'):>6} {str(s.get('threadpool_peak', '-')) + '/' + str(s.get('threadpool_limit', '-')):>8}",
+                file=out,
+            )
+        print(f"{endpoint:<18} sustains ~{result['sustained_concurrency']} concurrent requests before p95 degrades", file=out)
+        for s in result["stages"]:
+            if s.get("loop_stalls"):
+                print(
+                    f"{endpoint:<18} WARNING: event loop blocked {s['loop_stalls']} times at c={s['concurrency']} "
+                    f"(max {s['loop_lag_max_ms']} ms) - sync work is running on the loop",
+                    file=out,
+                )
+                break
+            if s.get("sample_error"):
+                print(f"{endpoint:<18} first error at c={s['concurrency']}: {s['sample_error']}", file=out)
+                break
+
+
+async def run_load(args, app, base_url: str, monitor: LoopMonitor, log) -> dict:
+    limits = httpx.Limits(max_connections=max(args.stages) * 2, max_keepalive_connections=max(args.stages))
+    if base_url is None:
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout)
+        monitor.start()
+    else:
+        client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+
+    results = {}
+    async with client:
+        for endpoint in args.endpoints:
+            method, path, make_kwargs = SCENARIOS[endpoint]
+            for _ in range(args.warmup):
+                with contextlib.suppress(Exception):
+                    await client.request(method, path, **make_kwargs(0))
+            stages = []
+            for concurrency in args.stages:
+                mark = monitor.mark()
+                stage = await run_stage(client, endpoint, concurrency, args.duration)
+                stage.update(monitor.since(mark, args.stall_ms / 1000))
+                stages.append(stage)
+                print(
+                    f"{endpoint} c={concurrency}: {stage['throughput_rps']} rps, p95 {stage['p95_ms']} ms, "
+                    f"{stage['errors']} errors, loop lag max {stage['loop_lag_max_ms']} ms",
+                    file=log,
+                )
+            results[endpoint] = {
+                "stages": stages,
+                "sustained_concurrency": sustained_concurrency(stages, args.degrade_factor, args.max_error_rate),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp concurrency against the backend with fake GitHub/LLM upstreams.")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess",
+                        help="Drive the app through an in-process ASGI transport or a real uvicorn server.")
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--stages", default="1,2,4,8,16", help="Comma-separated concurrency levels to ramp through.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per stage.")
+    parser.add_argument("--warmup", type=int, default=1, help="Warmup requests per endpoint before ramping.")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds.")
+    parser.add_argument("--github-latency", type=float, default=0.05, help="Seconds added to each fake GitHub response.")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds added to each fake LLM response.")
+    parser.add_argument("--stall-ms", type=float, default=100, help="Loop lag that counts as a blocking stall.")
+    parser.add_argument("--degrade-factor", type=float, default=2.0, help="p95 growth over the first stage that counts as degraded.")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--app-log", default=os.devnull, help="Where the app's own stdout goes during the run.")
+    parser.add_argument("--json", help="Write the full results to this file.")
+    parser.add_argument("--save-baseline", help="Save the results as a baseline for later --compare runs.")
+    parser.add_argument("--compare", help="Baseline file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change flagged as a regression.")
+    args = parser.parse_args(argv)
+
+    args.stages = [int(s) for s in args.stages.split(",") if s.strip()]
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = [e for e in args.endpoints if e not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)}")
+
+    scratch = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        run(args, scratch)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def run(args, scratch: str):
+    upstream_port = free_port()
+    serve_in_thread(create_fake_upstream(args.github_latency, args.llm_latency), upstream_port)
+    configure_environment(f"http://127.0.0.1:{upstream_port}", scratch)
+
+    from main import app
+
+    monitor = LoopMonitor()
+    base_url = None
+    if args.mode == "uvicorn":
+        app_port = free_port()
+        serve_in_thread(app, app_port, monitor)
+        base_url = f"http://127.0.0.1:{app_port}"
+
+    report = sys.stdout
+    with open(args.app_log, "a") as app_log, contextlib.redirect_stdout(app_log):
+        results = asyncio.run(run_load(args, app, base_url, monitor, sys.stderr))
+
+    print_report(results, report)
+    output = {
+        "meta": {
+            "mode": args.mode,
+            "stages": args.stages,
+            "duration": args.duration,
+            "github_latency": args.github_latency,
+            "llm_latency": args.llm_latency,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    for path in filter(None, [args.json, args.save_baseline]):
+        with open(path, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Results written to {path}", file=report)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.compare} ({baseline.get('meta', {}).get('timestamp')}):", file=report)
+        lines = compare_to_baseline(results, baseline, args.threshold)
+        for line in lines:
+            print(line, file=report)
+        if any(line.endswith("REGRESSION") for line in lines):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,28 @@
 import os
+import json
+import uuid
+from contextlib import ExitStack
 from app.agent.core import get_agent
+from app.agent.scheduler import get_scheduler
 from dotenv import load_dotenv
 
+from app.analysis.batch import run_batch
+from app.analysis.hotspots import churn_status, find_hotspots, git_head
+from app.config import HOTSPOT_CHURN_SINCE, HOTSPOT_TOP_N
 from app.analysis.linter import run_pylint
 from app.analysis.patcher import generate_patch
-from app.analysis.suggester import parse_pylint_output
+from app.analysis.suggester import decode_cursor, iter_suggestions, summarize_suggestions
 from app.github.parser import walk_python_files
 from app.routes import github
-from app.github.clone import clone_repo_from_url
+from app.github.prefetch import pin_snapshot
+from app.github.worktree import close_session_worktrees
+from app.utils.response_cache import get_response_cache
 from pydantic import BaseModel
 
 from app.agent.tools import load_and_analyze_repo
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 app = FastAPI()
 
@@ -24,7 +34,8 @@ def root():
 
 class RepoQueryRequest(BaseModel):
     repo_url: str
-    session_id: str = "default-session"
+    # requests without a session get a private one, so they don't share an overlay or memory
+    session_id: str | None = None
     query: str
     github_token: str | None = None
 
@@ -33,10 +44,23 @@ def query_repo(request: RepoQueryRequest):
     try:
         input_string = f"Query: {request.query}\nRepo_URL:{request.repo_url}"
 
-        # Let the agent handle the rest
-        agent = get_agent(session_id="repo-session", github_token=request.github_token)
-        print(f"Running agent for input: {input_string}")
-        result = agent.invoke({"input": input_string})
+        session_id = request.session_id or f"anon-{uuid.uuid4().hex[:12]}"
+        with ExitStack() as stack:
+            if not request.session_id:
+                stack.callback(close_session_worktrees, session_id)
+            # Start fetching the repo now so the clone overlaps the agent's first LLM step;
+            # the repo tools wait on it and the snapshot stays pinned until the agent is done
+            snapshot = None
+            try:
+                snapshot = stack.enter_context(pin_snapshot(request.repo_url, build_indexes=True))
+            except Exception as e:
+                # speculative: load_and_analyze_repo fetches the repo itself if this fails
+                print(f"Skipping prefetch: {e}")
+
+            # Let the agent handle the rest
+            agent = get_agent(session_id=session_id, repo_path=snapshot, github_token=request.github_token)
+            print(f"Running agent for input: {input_string}")
+            result = agent.invoke({"input": input_string})
 
         return {"response": result}
 
@@ -45,39 +69,119 @@ def query_repo(request: RepoQueryRequest):
 
 
 
+class BatchReviewRequest(BaseModel):
+    repo_urls: list[str]
+    recipe: dict = {}
+
+@app.post("/batch-review")
+async def batch_review(request: BatchReviewRequest):
+    async def stream():
+        async for result in run_batch(request.repo_urls, request.recipe):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/llm-stats")
+def llm_stats():
+    return get_scheduler().stats()
+
 @app.get("/test-agent")
 def test_agent():
     agent = get_agent("test-session")
     return {"response": agent.run({"input":"What is Python?"})}
 
+@app.get("/response-cache-stats")
+def response_cache_stats():
+    return get_response_cache().stats()
+
+# The analysis endpoints below are cached per tree fingerprint of app/ and answer
+# If-None-Match with 304, so polling them is cheap until a Python file changes.
+
 @app.get("/analyze-local")
-def analyze_local():
-    analysis = walk_python_files("app/")
-    return {"files_analyzed": len(analysis)}
+def analyze_local(request: Request):
+    def compute():
+        analysis = walk_python_files("app/")
+        return {"files_analyzed": len(analysis)}
+
+    return get_response_cache().respond(request, "analyze-local", "app/", compute)
 
 @app.get("/lint-local")
-def lint_local():
-    print("Running linter on local files...")
-    files = walk_python_files("app/")
-    results = []
-    for f in files:
-        if f.get("error") is None:
-            lint_result = run_pylint(f["path"])
-            results.append(lint_result)
-    return {"lint_issues": results}
+def lint_local(request: Request):
+    def compute():
+        print("Running linter on local files...")
+        files = walk_python_files("app/")
+        results = []
+        for f in files:
+            if f.get("error") is None:
+                lint_result = run_pylint(f["path"])
+                results.append(lint_result)
+        return {"lint_issues": results}
+
+    return get_response_cache().respond(request, "lint-local", "app/", compute)
+
+@app.get("/hotspots")
+def get_hotspots(top: int = HOTSPOT_TOP_N, since: str = HOTSPOT_CHURN_SINCE):
+    hotspots = find_hotspots("app/", top=top, since=since)
+    return {"total": len(hotspots), "churn": churn_status("app/"), "hotspots": hotspots}
 
 @app.get("/suggestions")
-def get_suggestions():
-    files = walk_python_files("app/")
-    suggestions = []
-
-    for f in files:
-        if f.get("error") is None:
-            lint = run_pylint(f["path"])
-            parsed = parse_pylint_output(lint["output"])
-            suggestions.extend(parsed)
-
-    return {"total": len(suggestions), "suggestions": suggestions}
+def get_suggestions(
+    request: Request,
+    stream: bool = False,
+    summary: bool = False,
+    cursor: str | None = None,
+    limit: int | None = None,
+    type: list[str] | None = Query(None),
+    code: list[str] | None = Query(None),
+    path: str | None = None,
+    duplicates: bool = False,
+    hotspots: int | None = None,
+):
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    feed = iter_suggestions(
+        "app/", types=type, codes=code, path_glob=path, cursor=cursor,
+        include_duplicates=duplicates, hotspots=hotspots,
+    )
+
+    def page():
+        count = 0
+        last_cursor = None
+        for next_cursor, suggestion in feed:
+            if limit and count >= limit:
+                # only hand out a cursor once we know another page has something in it
+                yield last_cursor, None
+                return
+            yield None, suggestion
+            count += 1
+            last_cursor = next_cursor
+
+    if stream and not summary:
+        def ndjson():
+            for next_cursor, suggestion in page():
+                yield json.dumps(suggestion if next_cursor is None else {"next_cursor": next_cursor}) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    def compute():
+        if summary:
+            return summarize_suggestions(suggestion for _, suggestion in feed)
+
+        suggestions = []
+        next_cursor = None
+        for next_cursor, suggestion in page():
+            if suggestion is not None:
+                suggestions.append(suggestion)
+
+        return {"total": len(suggestions), "suggestions": suggestions, "next_cursor": next_cursor}
+
+    # hotspot ranking also depends on git churn, which changes with every commit
+    version = git_head("app/") if hotspots else None
+    return get_response_cache().respond(request, "suggestions", "app/", compute, version)
 
 @app.post("/patch")
 def get_patch():